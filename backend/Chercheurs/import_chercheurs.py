@@ -1,48 +1,126 @@
-import numpy as np
 import pandas as pd
-from sqlmodel import create_engine,text,Session
-from database import DATABASE_URL,engine
-from .schemas import Chercheur
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert
+from sqlmodel import Session,select
+from database import engine
+from settings import DBLP_RESOLVE_CONCURRENCY
+from .schemas import Chercheur,GradeEnum
 from .orcid_s import get_dblp_url_from_name
 SOURCE_URL = "Lists-chercheurs/avecindexes.csv"
-def main(csv_path,session:Session,labo_id : int | None = None):
-    df = pd.read_csv(csv_path)
-    
-    
-    successful = 0
-    failed = []
-    
-    with Session(engine) as session:
-        for index, row in df.iterrows():
-            try:
-                chercheur = Chercheur(
-                    nom=row['nom'],
-                    prenom=row['prenom'], 
-                    email=row['email'],
-                    grade=row['grade'],
-                    google_scholar_url=row['google_scholar_url'],
-                    h_index = row['h_index'],
-                    i_10_index=row['i_10_index'],
-                    labo_id=labo_id
-                )
-                chercheur.dblp_url = get_dblp_url_from_name(chercheur.full_name)
-                session.add(chercheur)
-                successful += 1
-                
-            except Exception as e:
-                failed.append(f"Row {index + 1}: {e}")
-        
-        session.commit()
-    
-    print(f"Imported: {successful}, Failed: {len(failed)}")
-    for error in failed:
-        print(error)
 
+REQUIRED_COLUMNS = ["nom", "prenom", "email", "grade"]
+OPTIONAL_COLUMNS = {"google_scholar_url": None, "h_index": 0, "i_10_index": 0, "telephone": None}
+EMAIL_PATTERN = r"^[^@\s]+@[^@\s]+\.[^@\s]+$"
+IMPORT_CHUNK_SIZE = 1000
 
-if __name__ == '__main__':
+
+def validate_chercheurs_frame(df: pd.DataFrame, existing_emails: set[str] = frozenset()) -> tuple[pd.DataFrame, list[str]]:
+    """
+    Validate a whole CSV at once with column operations, same rules as ChercheurBase.
+    Returns (valid rows ready to insert, one error message per rejected row).
+    """
+    missing = [column for column in REQUIRED_COLUMNS if column not in df.columns]
+    if missing:
+        raise ValueError(f"Colonnes manquantes: {', '.join(missing)}")
+    df = df.copy()
+    for column, default in OPTIONAL_COLUMNS.items():
+        if column not in df.columns:
+            df[column] = default
+
+    for column in ("nom", "prenom", "email", "grade", "google_scholar_url", "telephone"):
+        df[column] = df[column].astype("string").str.strip().replace("", pd.NA)
+    df["nom"] = df["nom"].str.upper()
+    df["prenom"] = df["prenom"].str.upper()
+    df["email"] = df["email"].str.lower()
+    df["telephone"] = df["telephone"].str.replace(r"[^\d]", "", regex=True)
+    for column in ("h_index", "i_10_index"):
+        df[column] = pd.to_numeric(df[column], errors="coerce").fillna(0)
+
+    # row number in the file (header is line 1)
+    line = pd.Series(df.index + 2, index=df.index)
+    checks = [
+        (df["nom"].isna() | df["prenom"].isna(), "nom/prenom manquant"),
+        (~df["email"].fillna("").str.match(EMAIL_PATTERN), "email invalide"),
+        (~df["grade"].isin([grade.value for grade in GradeEnum]), "grade inconnu"),
+        (df["google_scholar_url"].notna() & ~df["google_scholar_url"].fillna("").str.match(r"^https?://\S+$"), "google_scholar_url invalide"),
+        (df["telephone"].notna() & ~df["telephone"].fillna("").str.match(r"^0[567]\d{8}$"), "telephone invalide"),
+        ((df["h_index"] < 0) | (df["i_10_index"] < 0), "index négatif"),
+        (df["email"].duplicated(keep="first"), "email en double dans le fichier"),
+        (df["email"].isin(existing_emails), "email déjà utilisé"),
+    ]
+    errors = pd.Series("", index=df.index)
+    for mask, message in checks:
+        mask = mask.fillna(True).astype(bool)
+        errors[mask] = errors[mask] + message + "; "
+
+    invalid = errors != ""
+    messages = [f"Row {n}: {error.rstrip('; ')}" for n, error in zip(line[invalid], errors[invalid])]
+    valid = df[~invalid].astype(object).where(df[~invalid].notna(), None)
+    valid["h_index"] = valid["h_index"].astype(int)
+    valid["i_10_index"] = valid["i_10_index"].astype(int)
+    return valid, messages
+
+
+def resolve_dblp_urls(names: list[str], concurrency: int = DBLP_RESOLVE_CONCURRENCY) -> dict[str, str | None]:
+    """
+    Look up the DBLP profile of many names at once. The http client keeps the requests
+    within the dblp.org rate budget and the response cache answers names already searched.
+    """
+    unique = list(dict.fromkeys(names))
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="dblp-search") as executor:
+        return dict(zip(unique, executor.map(get_dblp_url_from_name, unique)))
+
+
+def import_chercheurs(csv_file, labo_id: int | None = None, resolve_dblp: bool = True) -> dict:
+    """
+    Bulk import of a researchers CSV (path or file object): vectorized validation,
+    concurrent DBLP URL resolution, then a single multi-row INSERT.
+    """
+    df = pd.read_csv(csv_file, dtype=str, keep_default_na=False)
     with Session(engine) as session:
-        main(SOURCE_URL,session,1)
+        emails = [email.strip().lower() for email in df.get("email", pd.Series(dtype=str)).tolist()]
+        # stored emails keep the case they were entered with, the file's are lowercased
+        existing = set(session.exec(select(func.lower(Chercheur.email)).where(func.lower(Chercheur.email).in_(emails))).all()) if emails else set()
+        valid, errors = validate_chercheurs_frame(df, existing)
 
+        rows = valid[["nom", "prenom", "email", "grade", "google_scholar_url", "h_index", "i_10_index", "telephone"]].to_dict("records")
+        if resolve_dblp and rows:
+            urls = resolve_dblp_urls([f"{row['prenom']} {row['nom']}" for row in rows])
+        else:
+            urls = {}
+        for row in rows:
+            row["grade"] = GradeEnum(row["grade"])
+            row["dblp_url"] = urls.get(f"{row['prenom']} {row['nom']}")
+            row["labo_id"] = labo_id
 
+        imported = with_dblp_url = 0
+        table = Chercheur.__table__
+        # one multi-row INSERT per chunk (SQLite caps the number of bound values), one transaction
+        for i in range(0, len(rows), IMPORT_CHUNK_SIZE):
+            # ON CONFLICT: an email added since the validation is skipped instead of failing the whole file
+            inserted = session.exec(
+                insert(table).values(rows[i:i + IMPORT_CHUNK_SIZE]).on_conflict_do_nothing().returning(table.c.id, table.c.dblp_url)
+            ).all()
+            imported += len(inserted)
+            with_dblp_url += sum(1 for row in inserted if row.dblp_url)
+        session.commit()
 
+    report = {
+        "imported": imported,
+        "failed": len(errors) + len(rows) - imported,
+        "with_dblp_url": with_dblp_url,
+        "errors": errors,
+    }
+    print(f"Imported: {report['imported']}, Failed: {report['failed']}, with DBLP URL: {report['with_dblp_url']}")
+    for error in errors:
+        print(error)
+    return report
 
+
+def main(csv_path,session:Session | None = None,labo_id : int | None = None):
+    return import_chercheurs(csv_path, labo_id=labo_id)
+
+
+if __name__ == '__main__':
+    main(SOURCE_URL,labo_id=1)
@@ -1,72 +1,128 @@
+import argparse
 import time
 import requests
+from concurrent.futures import ThreadPoolExecutor,as_completed
+from datetime import datetime,timedelta,timezone
+from sqlalchemy import bindparam,delete,update
+from sqlalchemy.dialects.sqlite import insert
 from sqlmodel import Session, select
 from database import engine  # assuming you have an engine defined here
-from .schemas import Chercheur  # your Researcher model
+from http_cache import cached_get
+from settings import DBLP_RESOLVE_CONCURRENCY,DBLP_BACKFILL_MAX_SEARCHES,DBLP_BACKFILL_COMMIT_SIZE,DBLP_MISS_TTL_DAYS
+from .schemas import Chercheur,DblpRechercheVide  # your Researcher model
 
 
-def get_dblp_url_from_name(name: str, max_retries: int = 3):
+def search_dblp_author(name: str, use_cache: bool = True) -> str | None:
     """
-    Searches DBLP for the given researcher name and returns
-    the URL of the first matching profile (if found).
-    Retries on 429 (Too Many Requests).
+    URL of the first DBLP profile matching `name`, None when DBLP has no match.
+    Request errors are raised, so a failed search is not mistaken for a miss.
     """
-    base_url = "https://dblp.org/search/author/api"
-    params = {"q": name, "format": "json"}
-    headers = {"User-Agent": "Mozilla/5.0 (compatible; dblp-fetcher/1.0)"}
-
-    for attempt in range(max_retries):
-        try:
-            response = requests.get(base_url, params=params, headers=headers, timeout=10)
+    response = cached_get("https://dblp.org/search/author/api", params={"q": name, "format": "json"}, use_cache=use_cache, timeout=10)
+    response.raise_for_status()
+    hits = response.json().get("result", {}).get("hits", {}).get("hit", [])
+    if not hits:
+        return None
+    return hits[0]["info"].get("url")
 
-            if response.status_code == 429:
-                wait_time = int(response.headers.get("Retry-After", 2))
-                print(f"Rate limited. Waiting {wait_time} seconds before retry...")
-                time.sleep(wait_time)
-                continue
 
-            response.raise_for_status()
-            data = response.json()
-
-            hits = data.get("result", {}).get("hits", {}).get("hit", [])
-            if not hits:
-                return None
+def get_dblp_url_from_name(name: str):
+    """
+    Searches DBLP for the given researcher name and returns
+    the URL of the first matching profile (if found).
+    429 (Too Many Requests) and transient errors are retried by the shared http client,
+    which also paces requests to DBLP through the rate limiter.
+    """
+    try:
+        return search_dblp_author(name)
+    except requests.exceptions.RequestException as e:
+        print(f"Request error: {e}")
+        return None
 
-            first_hit = hits[0]["info"]
-            return first_hit.get("url")
 
-        except requests.exceptions.RequestException as e:
-            print(f"Request error: {e}")
-            if attempt < max_retries - 1:
-                print("Retrying...")
-                time.sleep(2)
-            else:
-                return None
+def _save_results(session: Session, found: list[dict], missed: list[str], misses: dict[str, int]) -> None:
+    """Write one batch of backfill results: dblp_url of the resolved researchers, misses cache."""
+    now = datetime.now(timezone.utc)
+    table = Chercheur.__table__
+    if found:
+        # dblp_url IS NULL: a URL set by hand during the backfill is kept
+        session.connection().execute(
+            update(table).where(table.c.id == bindparam("b_id"), table.c.dblp_url.is_(None)).values(dblp_url=bindparam("b_dblp_url")),
+            found,
+        )
+        session.exec(delete(DblpRechercheVide).where(DblpRechercheVide.nom_recherche.in_([row["b_name"] for row in found])))
+    if missed:
+        rows = [{"nom_recherche": name, "tentatives": misses.get(name, 0) + 1, "recherche_a": now} for name in missed]
+        stmt = insert(DblpRechercheVide.__table__).values(rows)
+        session.exec(stmt.on_conflict_do_update(
+            index_elements=["nom_recherche"],
+            set_={"tentatives": stmt.excluded.tentatives, "recherche_a": stmt.excluded.recherche_a},
+        ))
+    session.commit()
 
 
-def update_dblp_urls():
+def update_dblp_urls(concurrency: int = DBLP_RESOLVE_CONCURRENCY, max_searches: int | None = DBLP_BACKFILL_MAX_SEARCHES, retry_misses: bool = False) -> dict[str, int]:
     """
-    Fetches all researchers from the DB that don't have a dblp_url yet,
-    queries DBLP, and updates their dblp_url field.
+    Backfill the dblp_url of the researchers that don't have one yet. Names are searched
+    `concurrency` at a time (the rate limiter keeps them within the dblp.org budget), at most
+    `max_searches` per run. Names already searched without result less than DBLP_MISS_TTL_DAYS
+    ago are skipped unless `retry_misses`. Results are committed every DBLP_BACKFILL_COMMIT_SIZE.
     """
+    start = time.perf_counter()
     with Session(engine) as session:
-        # Get researchers without dblp_url
-        statement = select(Chercheur).where(Chercheur.dblp_url == None)
-        chercheurs = session.exec(statement).all()
+        chercheurs = session.exec(select(Chercheur.id, Chercheur.prenom, Chercheur.nom).where(Chercheur.dblp_url.is_(None))).all()
+        # researchers sharing a name share the search
+        names: dict[str, list[int]] = {}
+        for id, prenom, nom in chercheurs:
+            names.setdefault(f"{prenom} {nom}", []).append(id)
+
+        misses = dict(session.exec(select(DblpRechercheVide.nom_recherche, DblpRechercheVide.tentatives)).all())
+        expiry = datetime.now(timezone.utc) - timedelta(days=DBLP_MISS_TTL_DAYS)
+        recent_misses = set(session.exec(select(DblpRechercheVide.nom_recherche).where(DblpRechercheVide.recherche_a > expiry)).all())
+        to_search = [name for name in names if retry_misses or name not in recent_misses]
+        skipped = len(names) - len(to_search)
+        deferred = 0
+        if max_searches is not None and len(to_search) > max_searches:
+            deferred = len(to_search) - max_searches
+            to_search = to_search[:max_searches]
+        print(f"[INFO] {len(chercheurs)} researchers without DBLP URL: searching {len(to_search)} names, {skipped} known misses skipped, {deferred} left for the next run")
 
-        for chercheur in chercheurs:
-            print(f"Fetching DBLP URL for {chercheur.full_name}...")
-            dblp_url = get_dblp_url_from_name(chercheur.full_name)
-            if dblp_url:
-                chercheur.dblp_url = dblp_url
-                print(f"✅ Found: {dblp_url}")
-            else:
-                print(f"⚠️ No DBLP profile found for {chercheur.full_name}")
+        counts = {"resolved": 0, "unresolved": 0, "failed": 0, "skipped": skipped, "deferred": deferred}
+        found: list[dict] = []
+        missed: list[str] = []
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="dblp-backfill") as executor:
+            # a known miss searched again bypasses the HTTP cache, which would answer the old empty result
+            futures = {executor.submit(search_dblp_author, name, name not in misses): name for name in to_search}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    url = future.result()
+                except requests.exceptions.RequestException as e:
+                    print(f"[WARN] DBLP search for {name} failed: {e}")
+                    counts["failed"] += 1
+                    continue
+                if url:
+                    found.extend({"b_id": id, "b_dblp_url": url, "b_name": name} for id in names[name])
+                    counts["resolved"] += len(names[name])
+                else:
+                    missed.append(name)
+                    counts["unresolved"] += len(names[name])
+                if len(found) + len(missed) >= DBLP_BACKFILL_COMMIT_SIZE:
+                    _save_results(session, found, missed, misses)
+                    found, missed = [], []
+        _save_results(session, found, missed, misses)
 
-            session.add(chercheur)
-            session.commit()
-            time.sleep(1)  # Be nice to DBLP servers
+    print(
+        f"[INFO] DBLP backfill done in {time.perf_counter() - start:.1f}s: {counts['resolved']} resolved, "
+        f"{counts['unresolved']} unresolved, {counts['failed']} failed searches, {counts['skipped']} known misses skipped, "
+        f"{counts['deferred']} names left for the next run"
+    )
+    return counts
 
 
 if __name__ == "__main__":
-    update_dblp_urls()
+    parser = argparse.ArgumentParser(description="Cherche le profil DBLP des chercheurs qui n'en ont pas encore.")
+    parser.add_argument("--concurrency", type=int, default=DBLP_RESOLVE_CONCURRENCY, help="recherches DBLP en parallèle")
+    parser.add_argument("--max-searches", type=int, default=DBLP_BACKFILL_MAX_SEARCHES, help="nombre maximum de recherches pour ce passage")
+    parser.add_argument("--retry-misses", action="store_true", help="rechercher aussi les noms déjà sans résultat")
+    args = parser.parse_args()
+    update_dblp_urls(concurrency=args.concurrency, max_searches=args.max_searches, retry_misses=args.retry_misses)
@@ -5,7 +5,9 @@ from sqlmodel import select
 from sqlalchemy import func
 from sqlalchemy.orm import selectinload
 from fastapi.responses import JSONResponse
-from fastapi import HTTPException,Query,Response,Path
+from fastapi import HTTPException,Query,Response,Path,UploadFile,File,BackgroundTasks
+from .import_chercheurs import import_chercheurs
+from .orcid_s import update_dblp_urls
 from starlette import status
 chercheurs_router = APIRouter()
 
@@ -123,6 +125,28 @@ def create_chercheur(chercheur: ChercheurCreate, session: SessionDep):
 
 
 
+@chercheurs_router.post("/import")
+def import_chercheurs_csv(
+    session: SessionDep,
+    background_tasks: BackgroundTasks,
+    fichier: UploadFile = File(...,description="CSV avec les colonnes nom, prenom, email, grade (google_scholar_url, h_index, i_10_index, telephone optionnelles)"),
+    labo_id: int | None = Query(default=None,description="Laboratoire des chercheurs importés"),
+    resolve_dblp: bool = Query(default=False,description="Chercher ensuite le profil DBLP des chercheurs sans lien, en arrière-plan"),
+):
+    if labo_id is not None and not session.get(Labo,labo_id):
+        raise HTTPException(detail="Laboratoire introuvable.",status_code=status.HTTP_404_NOT_FOUND)
+    try:
+        report = import_chercheurs(fichier.file,labo_id=labo_id,resolve_dblp=False)
+    except ValueError as e:
+        raise HTTPException(detail=str(e),status_code=status.HTTP_400_BAD_REQUEST)
+    if resolve_dblp and report["imported"]:
+        # dblp.org allows about one search per second: the backfill runs after the response
+        background_tasks.add_task(update_dblp_urls)
+        report["dblp_resolution"] = "scheduled"
+    return report
+
+
+
 @chercheurs_router.patch("/{chercheur_id}",response_model=ChercheurBase)
 def update_chercheur(session:SessionDep,chercheur:ChercheurUpdate,chercheur_id : int = Path(...,ge=0)):
     result = session.get(Chercheur,chercheur_id)
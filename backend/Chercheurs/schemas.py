@@ -3,6 +3,7 @@ from pydantic import EmailStr,field_validator,HttpUrl
 from typing import Annotated,Literal,Optional
 import re
 from enum import Enum
+from datetime import datetime
 from Publications.liens_chercheur_pub import LienChercheurConference,LienChercheurRevue
 
 from enum import Enum
@@ -59,6 +60,7 @@ class ChercheurBase(SQLModel):
     grade : GradeEnum = Field(...,description="Grade du chercheur")
     google_scholar_url : str | None = Field(default=None,description="lien vers le profile de google scholar")
     dblp_url : str | None = Field(default=None,description="lien vers le profile de DBLP")
+    openalex_id : str | None = Field(default=None,index=True,description="identifiant OpenAlex de l'auteur (A...)")
     h_index : int = Field(default=0,description="h-index du chercheur")
     i_10_index : int = Field(default=0,description="i-10 index du chercheur")
     @property
@@ -110,6 +112,7 @@ class ChercheurBase(SQLModel):
 class Chercheur(ChercheurBase,table=True):
     id : int | None = Field(default=None,primary_key=True,ge=0)
     labo_id : int | None = Field(default=None,foreign_key="labo.id",ondelete='SET NULL')
+    derniere_synchronisation : datetime | None = Field(default=None,description="Date de la dernière synchronisation DBLP réussie")
     labo:Labo = Relationship(back_populates="chercheurs")
     conference_links : list[LienChercheurConference] = Relationship(back_populates="chercheur")
     revue_links : list[LienChercheurRevue] = Relationship(back_populates="chercheur")
@@ -117,6 +120,15 @@ class Chercheur(ChercheurBase,table=True):
 
 
 
+class DblpRechercheVide(SQLModel,table=True):
+    """Nom cherché sur DBLP sans résultat, pour ne pas le redemander à chaque backfill."""
+    nom_recherche : str = Field(primary_key=True)
+    tentatives : int = Field(default=1,description="Recherches sans résultat pour ce nom")
+    recherche_a : datetime = Field(index=True,description="Date de la dernière recherche")
+
+
+
+
 class ChercheurUpdate(ChercheurBase):
     nom: Optional[str] = None
     prenom: Optional[str] = None
@@ -125,6 +137,7 @@ class ChercheurUpdate(ChercheurBase):
     grade: Optional[GradeEnum] = None
     google_scholar_url: Optional[str] = None
     dblp_url: Optional[str] = None
+    openalex_id: Optional[str] = None
     h_index: Optional[int] = None
     i_10_index: Optional[int] = None
     labo_id: Optional[int] = None
@@ -0,0 +1,274 @@
+from pydantic import ValidationError
+from sqlalchemy import bindparam,func,update
+from sqlalchemy.dialects.sqlite import insert
+from sqlmodel import Session,select
+from metrics import metrics
+from .revue_schemas import PublicationRevue,Revue,RevueRanking,RevueBase,RevueRankingBase,PublicationRevueBase,normalized_key,normalized_issn,normalized_doi
+from .conference_schemas import ConferenceRanking,Conference,PublicationConference,ConferenceBase,ConferenceRankingBase,PublicationConferenceBase
+from .liens_chercheur_pub import LienChercheurRevue,LienChercheurConference
+from .key_registry import key_registry,nom_key,issn_key,doi_key,titre_key,venue_keys,publication_keys
+
+# models used for each publication type, everything that is not an article goes to conferences
+KINDS = {
+    "article": {
+        "venue": Revue, "venue_base": RevueBase, "venue_fk": "revue_id",
+        "ranking": RevueRanking, "ranking_base": RevueRankingBase,
+        "publication": PublicationRevue, "publication_base": PublicationRevueBase,
+        "link": LienChercheurRevue,
+    },
+    "conference": {
+        "venue": Conference, "venue_base": ConferenceBase, "venue_fk": "conference_id",
+        "ranking": ConferenceRanking, "ranking_base": ConferenceRankingBase,
+        "publication": PublicationConference, "publication_base": PublicationConferenceBase,
+        "link": LienChercheurConference,
+    },
+}
+
+
+# values allowed by the CHECK constraints of revueranking/conferenceranking, anything else
+# (DGRSDT "PEDIATRICE", Scimago "-", an unknown CORE label) is stored as NULL
+RANK_VALUES = {
+    "scimago_rank": {"Q1", "Q2", "Q3", "Q4"},
+    "dgrsdt_rank": {"A+", "A", "B", "C", "D", "E"},
+    "core_ranking": {"A*", "A", "B", "C"},
+}
+
+
+def _venue_key(kind: str, journal_data: dict) -> tuple | None:
+    # revues are matched by ISSN when there is one, otherwise (and for conferences) by name
+    if kind == "article" and journal_data.get("issn"):
+        return issn_key(journal_data["issn"])
+    return nom_key(journal_data.get("nom"))
+
+
+def _publication_key(pub_data: dict) -> tuple | None:
+    return doi_key(pub_data.get("doi")) or titre_key(pub_data.get("titre"), pub_data.get("annee_publication"))
+
+
+def _prepare(publication: dict) -> dict | None:
+    """Validate one enriched publication, returns None (with a warning) for rows we cannot store."""
+    kind = "article" if publication.get("type") == "article" else "conference"
+    models = KINDS[kind]
+    pub_data = publication.get("publication_data", {})
+    journal_data = publication.get("journal_data", {})
+    ranking_data = dict(publication.get("ranking_data", {}) or {})
+    for column, allowed in RANK_VALUES.items():
+        value = getattr(ranking_data.get(column), "value", ranking_data.get(column))  # plain str or a rank Enum
+        if value is not None and value not in allowed:
+            ranking_data[column] = None
+
+    venue_key = _venue_key(kind, journal_data)
+    publication_key = _publication_key(pub_data)
+    if venue_key is None or publication_key is None:
+        return None
+    try:
+        venue = models["venue_base"].model_validate(journal_data).model_dump()
+        pub = models["publication_base"].model_validate(pub_data).model_dump()
+        ranking = models["ranking_base"].model_validate(ranking_data).model_dump()
+    except ValidationError as e:
+        print(f"[WARN] Skipping invalid publication {pub_data.get('titre')!r}: {e.errors()[0].get('msg')}")
+        return None
+
+    venue["nom_cle"] = normalized_key(venue.get("nom"))
+    if kind == "article":
+        venue["issn_cle"] = normalized_issn(venue.get("issn"))
+    dblp_data = publication.get("dblp_data", {}) or {}
+    return {
+        "kind": kind,
+        "venue_key": venue_key,
+        "venue": venue,
+        "publication_key": publication_key,
+        "publication": {
+            **pub, "titre_cle": normalized_key(pub.get("titre")), "doi_cle": normalized_doi(pub.get("doi")),
+            "dblp_key": dblp_data.get("dblp_key"), "dblp_mdate": dblp_data.get("dblp_mdate"),
+        },
+        "ranking": ranking,
+        "annee": pub.get("annee_publication"),
+        "chercheur_ordre": (publication.get("researcher_position") or {}).get("chercheur_ordre"),
+        # other known researchers among the authors (chercheur id -> position), linked at the same time
+        "coauthors": publication.get("coauthors") or {},
+    }
+
+
+def _resolve_venues(session: Session, kind: str, keys: set[tuple]) -> dict[tuple, int]:
+    """Set-based fallback for the keys the registry does not know (rows written outside of this run...)."""
+    model = KINDS[kind]["venue"]
+    issns = [key[1] for key in keys if key[0] == "issn"]
+    noms = [key[1] for key in keys if key[0] == "nom"]
+    columns = [model.id, model.nom, model.issn] if model is Revue else [model.id, model.nom]
+    if issns:
+        for row in session.exec(select(*columns).where(model.issn_cle.in_(issns)).order_by(model.id)):
+            key_registry.add(model, venue_keys(model, row), row.id)
+    if noms:
+        for row in session.exec(select(*columns).where(model.nom_cle.in_(noms)).order_by(model.id)):
+            key_registry.add(model, venue_keys(model, row), row.id)
+    return _registered(model, keys)
+
+
+def _resolve_publications(session: Session, kind: str, keys: set[tuple]) -> dict[tuple, int]:
+    model = KINDS[kind]["publication"]
+    dois = [key[1] for key in keys if key[0] == "doi"]
+    titles = [key[1] for key in keys if key[0] == "titre"]
+    columns = [model.id, model.doi, model.titre, model.annee_publication]
+    if dois:
+        for row in session.exec(select(*columns).where(model.doi_cle.in_(dois)).order_by(model.id)):
+            key_registry.add(model, publication_keys(row), row.id)
+    if titles:
+        for row in session.exec(select(*columns).where(model.titre_cle.in_(titles)).order_by(model.id)):
+            key_registry.add(model, publication_keys(row), row.id)
+    return _registered(model, keys)
+
+
+def _registered(model, keys: set[tuple]) -> dict[tuple, int]:
+    found = {}
+    for key in keys:
+        id = key_registry.get(model, key)
+        if id is not None:
+            found[key] = id
+    return found
+
+
+def _resolve(session: Session, kind: str, model, keys: set[tuple]) -> dict[tuple, int]:
+    """
+    Registry first, one set-based query for the keys it does not know: rows stored by another
+    worker process since the registry was loaded, or rows an insert skipped (ON CONFLICT hit).
+    """
+    found = _registered(model, keys)
+    unknown = keys - found.keys()
+    if unknown:
+        resolver = _resolve_venues if model is KINDS[kind]["venue"] else _resolve_publications
+        found.update(resolver(session, kind, unknown))
+    return found
+
+
+def _insert_new(session: Session, model, rows: list[dict]) -> None:
+    """Multi-row INSERT ... ON CONFLICT DO NOTHING RETURNING, the new ids go straight to the registry."""
+    if not rows:
+        return
+    table = model.__table__
+    if model in (Revue, Conference):
+        columns, keys_of = ["nom", "issn"] if model is Revue else ["nom"], lambda row: venue_keys(model, row)
+    else:
+        columns, keys_of = ["doi", "titre", "annee_publication"], publication_keys
+    stmt = insert(table).values(rows).on_conflict_do_nothing().returning(table.c.id, *(table.c[c] for c in columns))
+    inserted = session.exec(stmt).all()
+    for row in inserted:
+        key_registry.add(model, keys_of(row), row.id)
+    metrics.rows_written(f"{table.name} insert", len(inserted))
+
+
+def _insert(session: Session, model, rows: list[dict]) -> None:
+    if rows:
+        result = session.exec(insert(model.__table__).values(rows).on_conflict_do_nothing())
+        metrics.rows_written(f"{model.__table__.name} insert", result.rowcount)
+
+
+def _refresh_existing(session: Session, model, rows: list[dict]) -> None:
+    """Record the DBLP key/mdate on stored publications and refresh the fields that change over time (non-null values only)."""
+    if not rows:
+        return
+    table = model.__table__
+    stmt = (
+        update(table)
+        .where(table.c.id == bindparam("b_id"))
+        .values({
+            column: func.coalesce(bindparam(f"b_{column}"), table.c[column])
+            for column in ("dblp_key", "dblp_mdate", "citations", "is_open_access", "abstract")
+        })
+    )
+    session.connection().execute(stmt, [{f"b_{k}": v for k, v in row.items()} for row in rows])
+    metrics.rows_written(f"{table.name} update", len(rows))
+
+
+def _persist_kind(session: Session, kind: str, researcher_id: int, rows: list[dict]) -> int:
+    models = KINDS[kind]
+
+    # 1. venues: look them up (registry, then the table for rows written by other processes),
+    # insert the missing ones, the insert returns their ids
+    keys = {row["venue_key"] for row in rows}
+    venue_ids = _resolve(session, kind, models["venue"], keys)
+    missing = {}
+    for row in rows:
+        if row["venue_key"] not in venue_ids:
+            # first spelling wins, like the publications below
+            missing.setdefault(row["venue_key"], row["venue"])
+    if missing:
+        _insert_new(session, models["venue"], list(missing.values()))
+        venue_ids = _resolve(session, kind, models["venue"], keys)
+
+    stored = [row for row in rows if row["venue_key"] in venue_ids]
+    for row in rows:
+        if row["venue_key"] not in venue_ids:
+            # e.g. an e_issn already used by another revue
+            print(f"[WARN] Could not store venue {row['venue'].get('nom')!r}, skipping {row['publication']['titre']!r}")
+
+    # 2. publications: new ones are inserted with their venue, known ones get the DBLP key and fresh counters
+    keys = {row["publication_key"] for row in stored}
+    publication_ids = _resolve(session, kind, models["publication"], keys)
+    new_publications, existing = {}, {}
+    for row in stored:
+        if row["publication_key"] in publication_ids:
+            existing[publication_ids[row["publication_key"]]] = {"id": publication_ids[row["publication_key"]], **{
+                column: row["publication"].get(column)
+                for column in ("dblp_key", "dblp_mdate", "citations", "is_open_access", "abstract")
+            }}
+        else:
+            new_publications.setdefault(row["publication_key"], {
+                **row["publication"], models["venue_fk"]: venue_ids[row["venue_key"]],
+            })
+    # a title-only row that matches a new row with a DOI gets that row's id once it is inserted
+    titles_with_doi = {
+        titre_key(pub["titre"], pub["annee_publication"]) for key, pub in new_publications.items() if key[0] == "doi"
+    }
+    new_publications = {key: pub for key, pub in new_publications.items() if key not in titles_with_doi}
+    _refresh_existing(session, models["publication"], list(existing.values()))
+    if new_publications:
+        _insert_new(session, models["publication"], list(new_publications.values()))
+        publication_ids = _resolve(session, kind, models["publication"], keys)
+
+    # 3. rankings of (venue, year) that are not stored yet, the researcher links and the co-author links
+    rankings, links, coauthor_links = {}, {}, {}
+    for row in stored:
+        venue_id = venue_ids[row["venue_key"]]
+        if row["annee"]:
+            rankings.setdefault((venue_id, row["annee"]), {
+                **row["ranking"], models["venue_fk"]: venue_id, "annee": row["annee"],
+            })
+        publication_id = publication_ids.get(row["publication_key"])
+        if publication_id is not None:
+            links.setdefault(publication_id, {
+                "chercheur_id": researcher_id,
+                "publication_id": publication_id,
+                "chercheur_ordre": row["chercheur_ordre"],
+            })
+            for chercheur_id, position in row["coauthors"].items():
+                if chercheur_id != researcher_id:
+                    coauthor_links.setdefault((chercheur_id, publication_id), {
+                        "chercheur_id": chercheur_id,
+                        "publication_id": publication_id,
+                        "chercheur_ordre": position,
+                    })
+    _insert(session, models["ranking"], list(rankings.values()))
+    _insert(session, models["link"], list(links.values()) + list(coauthor_links.values()))
+    metrics.count("links.coauthors", len(coauthor_links))
+    return len(links)
+
+
+@metrics.timed("db.bulk_persist")
+def bulk_persist_publications(session: Session, researcher_id: int, publications: list[dict]) -> int:
+    """
+    Store a batch of enriched publications (venues, publications, rankings, links) with
+    multi-row INSERT ... ON CONFLICT DO NOTHING, existing rows are found in the run-wide
+    key registry (loaded on first use). Publications carrying `coauthors` (chercheur id -> position)
+    are linked to those researchers too. Invalid rows are skipped. Does not commit, the caller
+    owns the transaction and must call key_registry.commit()/rollback() with it.
+    Returns the number of publications linked to the researcher.
+    """
+    if not key_registry.loaded:
+        key_registry.load(session)
+    by_kind: dict[str, list[dict]] = {"article": [], "conference": []}
+    for publication in publications:
+        row = _prepare(publication)
+        if row is not None:
+            by_kind[row["kind"]].append(row)
+    return sum(_persist_kind(session, kind, researcher_id, rows) for kind, rows in by_kind.items() if rows)
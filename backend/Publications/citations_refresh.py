@@ -0,0 +1,87 @@
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import bindparam,update
+from sqlmodel import Session,select
+from database import engine
+from settings import ENRICHMENT_CONCURRENCY
+from .revue_schemas import PublicationRevue
+from .conference_schemas import PublicationConference
+from .publications_script import OPENALEX_DOI_BATCH_SIZE,fetch_openalex_works_by_doi,normalize_doi
+
+# the only fields a weekly refresh needs, keeps OpenAlex responses small
+CITATION_FIELDS = "doi,cited_by_count,open_access"
+
+
+def _fetch_counts(dois: list[str]) -> dict[str, dict | None]:
+    # use_cache=False: counts must be fresh, and caching them would only fill the cache
+    return fetch_openalex_works_by_doi(dois, select=CITATION_FIELDS, use_cache=False)
+
+
+def refresh_citations(concurrency: int = ENRICHMENT_CONCURRENCY) -> dict[str, int]:
+    """
+    Update `citations` and `is_open_access` of every publication having a DOI, without
+    going through DBLP or the rankings: batched `filter=doi:` requests to OpenAlex, then
+    one bulk UPDATE per table for the rows that changed.
+    """
+    start = time.perf_counter()
+    with Session(engine) as session:
+        # normalized DOI -> [(model, id, citations, is_open_access)], a DOI can be stored in both tables
+        stored: dict[str, list[tuple]] = {}
+        for model in (PublicationRevue, PublicationConference):
+            rows = session.exec(
+                select(model.id, model.doi, model.citations, model.is_open_access).where(model.doi.is_not(None))
+            ).all()
+            for id, doi, citations, is_open_access in rows:
+                stored.setdefault(normalize_doi(doi), []).append((model, id, citations, is_open_access))
+
+        dois = list(stored)
+        chunks = [dois[i:i + OPENALEX_DOI_BATCH_SIZE] for i in range(0, len(dois), OPENALEX_DOI_BATCH_SIZE)]
+        print(f"[INFO] Refreshing citations of {len(dois)} DOIs in {len(chunks)} OpenAlex requests")
+        works: dict[str, dict | None] = {}
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="citations") as executor:
+            for result in executor.map(_fetch_counts, chunks):
+                works.update(result)
+
+        changes = {PublicationRevue: [], PublicationConference: []}
+        for doi, work in works.items():
+            if not work:
+                continue
+            citations = work.get("cited_by_count")
+            is_open_access = (work.get("open_access") or {}).get("is_oa")
+            for model, id, old_citations, old_open_access in stored[doi]:
+                new_citations = citations if citations is not None else old_citations
+                new_open_access = is_open_access if is_open_access is not None else old_open_access
+                if (new_citations, new_open_access) != (old_citations, old_open_access):
+                    changes[model].append({"b_id": id, "b_citations": new_citations, "b_is_open_access": new_open_access})
+
+        for model, rows in changes.items():
+            if rows:
+                table = model.__table__
+                session.connection().execute(
+                    update(table)
+                    .where(table.c.id == bindparam("b_id"))
+                    .values(citations=bindparam("b_citations"), is_open_access=bindparam("b_is_open_access")),
+                    rows,
+                )
+        session.commit()
+
+    counts = {
+        "dois": len(dois),
+        "found": sum(1 for work in works.values() if work),
+        "not_found": sum(1 for work in works.values() if work is None),
+        "failed": len(dois) - len(works),
+        "updated": sum(len(rows) for rows in changes.values()),
+    }
+    print(
+        f"[INFO] Citations refreshed in {time.perf_counter() - start:.1f}s: {counts['updated']} publications updated, "
+        f"{counts['found']} DOIs found, {counts['not_found']} unknown to OpenAlex, {counts['failed']} in failed batches"
+    )
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Met à jour les citations et l'accès ouvert des publications ayant un DOI, sans resynchroniser DBLP.")
+    parser.add_argument("--concurrency", type=int, default=ENRICHMENT_CONCURRENCY, help="requêtes OpenAlex en parallèle")
+    args = parser.parse_args()
+    refresh_citations(concurrency=args.concurrency)
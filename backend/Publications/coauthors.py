@@ -0,0 +1,120 @@
+import re
+import threading
+import unicodedata
+from collections import Counter
+from sqlalchemy import update
+from sqlmodel import Session,select
+from Chercheurs.schemas import Chercheur
+
+
+def short_author_id(author_id: str | None) -> str | None:
+    """'https://openalex.org/A5023888391' -> 'A5023888391'."""
+    if not author_id:
+        return None
+    return author_id.rstrip("/").rsplit("/", 1)[-1].upper()
+
+
+def author_name_key(name: str | None) -> tuple | None:
+    """
+    Order-insensitive name key: accents, punctuation and DBLP homonym numbers ('0001')
+    are dropped, so 'Walid-Khaled Hidouci 0001' and 'HIDOUCI WALID KHALED' match.
+    """
+    if not name:
+        return None
+    name = unicodedata.normalize("NFKD", name)
+    name = "".join(c for c in name if not unicodedata.combining(c)).lower()
+    tokens = [token for token in re.split(r"[^a-z]+", name) if token]
+    return tuple(sorted(tokens)) or None
+
+
+class CoauthorIndex:
+    """
+    Known researchers by OpenAlex author id, loaded at the start of a run. Used to link a
+    publication to every known co-author when it is first stored, and to remember which papers
+    were already handled in the run so co-authors don't enrich them again.
+    Co-authors are only recognised by their author id: a name alone (common name pairs) could
+    link a paper to the wrong researcher and hide it from that researcher's own sync. The ids are
+    learned from each researcher's own DBLP papers (own_author_id, learn_author_ids).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.by_author_id: dict[str, int] = {}
+        # dblp key -> researchers linked to it during this run
+        self.handled: dict[str, set[int]] = {}
+
+    def load(self, session: Session) -> None:
+        by_author_id = {
+            short_author_id(openalex_id): id
+            for id, openalex_id in session.exec(select(Chercheur.id, Chercheur.openalex_id).where(Chercheur.openalex_id.is_not(None))).all()
+        }
+        with self._lock:
+            self.by_author_id = by_author_id
+            self.handled = {}
+
+    def match(self, authorships: list[dict] | None) -> dict[int, str | None]:
+        """Known researchers among the authors of a work, by OpenAlex author id: chercheur id -> author position."""
+        found: dict[int, str | None] = {}
+        for authorship in authorships or []:
+            author = authorship.get("author") or {}
+            with self._lock:
+                id = self.by_author_id.get(short_author_id(author.get("id")))
+            if id is not None:
+                found.setdefault(id, authorship.get("author_position"))
+        return found
+
+    def own_author_id(self, authorships: list[dict] | None, chercheur_id: int, *names: str | None) -> str | None:
+        """OpenAlex id of the researcher in a work's authorships, found by name."""
+        keys = {author_name_key(name) for name in names} - {None}
+        for authorship in authorships or []:
+            author = authorship.get("author") or {}
+            author_id = short_author_id(author.get("id"))
+            if not author_id:
+                continue
+            owner = self.by_author_id.get(author_id)
+            if owner == chercheur_id:
+                return author_id
+            # an id already known for another researcher is never taken over
+            if owner is None and author_name_key(author.get("display_name")) in keys:
+                return author_id
+        return None
+
+    def already_linked(self, dblp_key: str | None, chercheur_id: int) -> bool:
+        """True when the paper was stored earlier in the run with a link to this researcher."""
+        if not dblp_key:
+            return False
+        with self._lock:
+            return chercheur_id in self.handled.get(dblp_key, ())
+
+    def mark_handled(self, dblp_key: str | None, chercheur_ids) -> None:
+        if not dblp_key:
+            return
+        with self._lock:
+            self.handled.setdefault(dblp_key, set()).update(chercheur_ids)
+
+    def learn_author_ids(self, session: Session, author_ids: dict[int, Counter]) -> int:
+        """
+        Store the OpenAlex id seen most often for each researcher that has none yet,
+        returns the number of researchers updated. Does not commit.
+        """
+        updated = 0
+        for chercheur_id, seen in author_ids.items():
+            if not seen:
+                continue
+            author_id = seen.most_common(1)[0][0]
+            if self.by_author_id.get(author_id, chercheur_id) != chercheur_id:
+                continue
+            result = session.exec(
+                update(Chercheur)
+                .where(Chercheur.id == chercheur_id, Chercheur.openalex_id.is_(None))
+                .values(openalex_id=author_id)
+            )
+            if result.rowcount:
+                updated += 1
+                with self._lock:
+                    self.by_author_id.setdefault(author_id, chercheur_id)
+        return updated
+
+
+# shared by the stages of a run, run_pipeline loads it at the start
+coauthor_index = CoauthorIndex()
@@ -1,7 +1,9 @@
 from sqlmodel import SQLModel,Field,Relationship,CheckConstraint
+from sqlalchemy import Index,event,text
 from pydantic import field_validator,HttpUrl
 from enum import Enum
-from .revue_schemas import ScimagoRanking
+from datetime import date
+from .revue_schemas import ScimagoRanking,normalized_key,normalized_doi
 from .liens_chercheur_pub import LienChercheurConference
 class CoreRanking(str,Enum):
     AA = "A*"
@@ -39,10 +41,19 @@ class PublicationConferenceBase(SQLModel):
 
 class PublicationConference(PublicationConferenceBase,table = True):
     id : int | None = Field(default=None,primary_key=True)
+    titre_cle : str | None = Field(default=None,index=True,description="Titre normalisé (normalized_key) pour la déduplication")
+    doi_cle : str | None = Field(default=None,index=True,description="DOI normalisé (normalized_doi) pour la déduplication")
+    dblp_key : str | None = Field(default=None,index=True,description="Clé de l'enregistrement DBLP (conf/...)")
+    dblp_mdate : date | None = Field(default=None,description="Date de dernière modification de l'enregistrement DBLP")
     conference_id : int | None = Field(default=None,foreign_key="conference.id",ondelete='SET NULL')
     conference : "Conference" = Relationship(back_populates="publications")
     chercheur_links : list[LienChercheurConference] = Relationship(back_populates="publication_conference")
 
+    __table_args__ = (
+        # publications without DOI are deduplicated on their title and year
+        Index("uq_publicationconference_titre_cle_sans_doi", "titre_cle", "annee_publication", unique=True, sqlite_where=text("doi IS NULL")),
+    )
+
 
 class PublicationConferenceCreate(SQLModel):
     titre: str
@@ -87,11 +98,25 @@ class ConferenceBase(SQLModel):
 
 class Conference(ConferenceBase,table = True):
     id : int | None = Field(default=None,primary_key=True)
+    nom_cle : str | None = Field(default=None,unique=True,index=True,description="Nom normalisé (normalized_key) pour la déduplication")
     publications : list[PublicationConference] = Relationship(back_populates="conference")
     rankings : list["ConferenceRanking"] = Relationship(back_populates="conference")
 
 
 
+@event.listens_for(Conference, "before_insert")
+@event.listens_for(Conference, "before_update")
+def _set_conference_nom_cle(mapper, connection, target):
+    target.nom_cle = normalized_key(target.nom)
+
+
+@event.listens_for(PublicationConference, "before_insert")
+@event.listens_for(PublicationConference, "before_update")
+def _set_publication_conference_keys(mapper, connection, target):
+    target.titre_cle = normalized_key(target.titre)
+    target.doi_cle = normalized_doi(target.doi)
+
+
 class ConferenceUpdate(ConferenceBase):
     nom : str | None = None
     acronyme : str | None = None
@@ -0,0 +1,131 @@
+import argparse
+import gzip
+import html.entities
+import re
+import unicodedata
+import xml.etree.ElementTree as ET
+from sqlmodel import Session,select
+from Chercheurs.schemas import Chercheur
+from database import engine
+from .key_registry import key_registry
+from .publications_script import parse_dblp_record,enrich_records,known_dblp_records,persist_researcher_publications
+
+# publication elements of dblp.xml, <www key="homepages/..."> are the person records
+DBLP_PUBLICATION_TAGS = {"article", "inproceedings", "proceedings", "book", "incollection", "phdthesis", "mastersthesis", "data"}
+
+
+def pid_from_dblp_url(dblp_url: str) -> str:
+    return dblp_url.split("pid/")[-1].replace(".html", "")
+
+
+def name_key(name: str | None) -> str:
+    """
+    Order/accent/case insensitive key of a person name, without DBLP's homonym
+    number: 'Jürgen Müller 0002' and 'MULLER JURGEN' give the same key.
+    """
+    if not name:
+        return ""
+    name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode()
+    tokens = re.findall(r"[a-z]+", name.lower())
+    return " ".join(sorted(tokens))
+
+
+def _dump_parser() -> ET.XMLParser:
+    # dblp.xml relies on the HTML entities of dblp.dtd (&uuml; ...) which expat does not load
+    parser = ET.XMLParser()
+    parser.entity.update({name: chr(codepoint) for name, codepoint in html.entities.name2codepoint.items()})
+    return parser
+
+
+def scan_dblp_dump(dump_path: str, chercheurs: list[Chercheur]) -> dict[int, tuple[str | None, list[dict]]]:
+    """
+    One streaming pass over dblp.xml(.gz).
+    Collects the homepage record (homepages/<pid>) of every researcher, which gives their
+    exact DBLP names, and every publication with an author whose name matches one of
+    our researchers. Returns chercheur id -> (DBLP name, parsed records).
+    """
+    by_pid = {pid_from_dblp_url(c.dblp_url): c.id for c in chercheurs}
+    wanted_keys = {name_key(f"{c.prenom} {c.nom}") for c in chercheurs}
+    dblp_names: dict[int, list[str]] = {}
+    candidates: list[tuple[dict, set[str]]] = []
+
+    opener = gzip.open if dump_path.endswith(".gz") else open
+    with opener(dump_path, "rb") as stream:
+        events = ET.iterparse(stream, events=("start", "end"), parser=_dump_parser())
+        _, root = next(events)
+        depth = 1
+        for event, elem in events:
+            if event == "start":
+                depth += 1
+                continue
+            depth -= 1
+            if depth != 1:
+                continue
+
+            key = elem.attrib.get("key", "")
+            if elem.tag == "www" and key.startswith("homepages/"):
+                chercheur_id = by_pid.get(key[len("homepages/"):])
+                if chercheur_id is not None:
+                    dblp_names[chercheur_id] = [a.text for a in elem.findall("author") if a.text]
+            elif elem.tag in DBLP_PUBLICATION_TAGS:
+                authors = {a.text for a in elem.findall("author") if a.text}
+                if any(name_key(author) in wanted_keys for author in authors):
+                    candidates.append((parse_dblp_record(elem), authors))
+            root.clear()
+
+    result = {}
+    for chercheur in chercheurs:
+        names = dblp_names.get(chercheur.id)
+        if not names:
+            print(f"[WARN] No homepage for {chercheur.dblp_url} in the dump")
+            continue
+        records = [record for record, authors in candidates if authors.intersection(names)]
+        if not records and not any(name_key(n) in wanted_keys for n in names):
+            print(f"[WARN] DBLP name {names[0]!r} differs from {chercheur.full_name!r}, sync this researcher from the API instead")
+        # OpenAlex display names have no homonym number ('Jane Doe 0001' -> 'Jane Doe')
+        result[chercheur.id] = (re.sub(r"\s+\d{4}$", "", names[0]), records)
+    return result
+
+
+def ingest_dblp_dump(dump_path: str, incremental: bool = True) -> int:
+    """
+    Import the publications of every researcher having a dblp_url from a local
+    dblp.xml.gz, then enrich and store them exactly like process_researcher_publications.
+    Returns the number of researchers that failed, including those missing from the dump.
+    """
+    with Session(engine) as session:
+        chercheurs = session.exec(
+            select(Chercheur).where(Chercheur.dblp_url.is_not(None))
+        ).all()
+        print(f"🔍 Scanning {dump_path} for {len(chercheurs)} researchers...")
+        scanned = scan_dblp_dump(dump_path, chercheurs)
+        key_registry.load(session)
+
+        failed = 0
+        for researcher in chercheurs:
+            if researcher.id not in scanned:
+                # no homepage record in the dump: nothing was imported for this researcher
+                failed += 1
+                print(f" Error processing {researcher.nom}: no homepage for {researcher.dblp_url} in the dump")
+                continue
+            dblp_name, records = scanned[researcher.id]
+            try:
+                print(f" Processing researcher: {researcher.nom} ({len(records)} records in dump)")
+                known_records = known_dblp_records(session, researcher.id) if incremental else None
+                publications = enrich_records(records, dblp_name, known_records)
+                persist_researcher_publications(session, researcher, publications)
+                print(f" Done with {researcher.nom}")
+            except Exception as e:
+                session.rollback()
+                key_registry.rollback()
+                failed += 1
+                print(f" Error processing {researcher.nom}: {e}")
+    return failed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Importe les publications des chercheurs depuis un dump dblp.xml.gz local.")
+    parser.add_argument("dump", help="chemin vers dblp.xml.gz")
+    parser.add_argument("--full", action="store_true", help="re-enrich every DBLP record, even unchanged ones")
+    args = parser.parse_args()
+    print(f"***Failed = {ingest_dblp_dump(args.dump, incremental=not args.full)}")
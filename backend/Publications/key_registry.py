@@ -0,0 +1,124 @@
+import threading
+from contextlib import contextmanager
+from typing import Hashable
+from sqlmodel import Session,select
+from .revue_schemas import PublicationRevue,Revue,normalized_key,normalized_issn,normalized_doi
+from .conference_schemas import PublicationConference,Conference
+
+
+def nom_key(nom: str | None) -> tuple | None:
+    if nom is None:
+        return None
+    return ("nom", normalized_key(nom))
+
+
+def issn_key(issn: str | None) -> tuple | None:
+    issn = normalized_issn(issn)
+    if issn is None:
+        return None
+    return ("issn", issn)
+
+
+def doi_key(doi: str | None) -> tuple | None:
+    doi = normalized_doi(doi)
+    if doi is None:
+        return None
+    return ("doi", doi)
+
+
+def titre_key(titre: str | None, annee: int | None) -> tuple | None:
+    titre = normalized_key(titre or "")
+    if titre == "":
+        return None
+    return ("titre", titre, int(annee or 0))
+
+
+def venue_keys(model, row) -> list[tuple]:
+    """Every key a stored revue/conference can be found by (row is a dict or a result row)."""
+    get = row.get if isinstance(row, dict) else row._mapping.get
+    keys = [nom_key(get("nom"))]
+    if model is Revue:
+        keys.append(issn_key(get("issn")))
+    return [key for key in keys if key]
+
+
+def publication_keys(row) -> list[tuple]:
+    get = row.get if isinstance(row, dict) else row._mapping.get
+    keys = [doi_key(get("doi")), titre_key(get("titre"), get("annee_publication"))]
+    return [key for key in keys if key]
+
+
+class KeyRegistry:
+    """
+    Run-wide identity map: (model, normalized key) -> id for venues (name, ISSN) and
+    publications (DOI, title + year), loaded once per sync so deduplication is a dict lookup
+    instead of a scan of the nom_cle/issn_cle/titre_cle/doi_cle columns per row.
+    Ids added while a researcher is being stored stay pending until commit(), a rollback()
+    drops them together with the transaction that created them.
+    """
+
+    MODELS = (Revue, Conference, PublicationRevue, PublicationConference)
+
+    def __init__(self):
+        self._ids: dict[tuple, int] = {}
+        self._pending: dict[tuple, int] = {}
+        self._lock = threading.Lock()
+        self.loaded = False
+
+    def load(self, session: Session) -> None:
+        ids = {}
+        for model in self.MODELS:
+            columns = [model.id, model.nom] if model in (Revue, Conference) else [model.id, model.doi, model.titre, model.annee_publication]
+            if model is Revue:
+                columns.append(model.issn)
+            # lowest id first, same winner as the .first() lookups it replaces
+            for row in session.exec(select(*columns).order_by(model.id)):
+                keys = venue_keys(model, row) if model in (Revue, Conference) else publication_keys(row)
+                for key in keys:
+                    ids.setdefault((model, key), row.id)
+        with self._lock:
+            self._ids = ids
+            self._pending = {}
+            self.loaded = True
+        print(f"[INFO] Key registry loaded with {len(ids)} keys")
+
+    def get(self, model, key: Hashable) -> int | None:
+        with self._lock:
+            found = self._ids.get((model, key))
+            return found if found is not None else self._pending.get((model, key))
+
+    def add(self, model, keys: list[tuple], id: int) -> None:
+        with self._lock:
+            for key in keys:
+                if (model, key) not in self._ids:
+                    self._pending.setdefault((model, key), id)
+
+    def commit(self) -> None:
+        with self._lock:
+            self._ids.update(self._pending)
+            self._pending = {}
+
+    def rollback(self) -> None:
+        with self._lock:
+            self._pending = {}
+
+    @contextmanager
+    def savepoint(self):
+        """Goes with a session.begin_nested(): the ids added inside are dropped if it raises."""
+        with self._lock:
+            saved = dict(self._pending)
+        try:
+            yield
+        except BaseException:
+            with self._lock:
+                self._pending = saved
+            raise
+
+    def clear(self) -> None:
+        with self._lock:
+            self._ids = {}
+            self._pending = {}
+            self.loaded = False
+
+
+key_registry = KeyRegistry()
@@ -0,0 +1,87 @@
+from collections import Counter
+from typing import Iterator
+from http_cache import cached_get
+from metrics import metrics
+from .coauthors import coauthor_index
+from .ranking_index import normalize_name
+from .publications_script import OPENALEX_WORK_FIELDS,OPENALEX_DOI_BATCH_SIZE,fetch_openalex_works_by_doi,metadata_from_work,normalize_doi
+
+# OpenAlex maximum page size
+AUTHOR_WORKS_PAGE_SIZE = 200
+AUTHOR_WORK_FIELDS = OPENALEX_WORK_FIELDS + ",publication_year"
+
+
+@metrics.timed("openalex.author_works")
+def fetch_openalex_author_works(author_id: str) -> Iterator[dict]:
+    """
+    Every work of an OpenAlex author, AUTHOR_WORKS_PAGE_SIZE per request with cursor paging.
+    Not cached: a stored page would hand back a cursor OpenAlex may no longer accept.
+    """
+    cursor = "*"
+    while cursor:
+        params = {
+            "filter": f"author.id:{author_id}",
+            "per-page": AUTHOR_WORKS_PAGE_SIZE,
+            "cursor": cursor,
+            "select": AUTHOR_WORK_FIELDS,
+        }
+        response = cached_get("https://api.openalex.org/works", params=params, timeout=30, use_cache=False)
+        response.raise_for_status()
+        data = response.json()
+        results = data.get("results", [])
+        yield from results
+        cursor = (data.get("meta") or {}).get("next_cursor") if results else None
+
+
+def _title_key(title: str | None) -> str:
+    return normalize_name(title or "")
+
+
+class AuthorWorks:
+    """The works of one author, indexed to reconcile DBLP records by DOI, then by title (and year)."""
+
+    def __init__(self, works):
+        self.by_doi: dict[str, dict] = {}
+        self.by_title_year: dict[tuple[str, int | None], dict] = {}
+        by_title: dict[str, list[dict]] = {}
+        for work in works:
+            metadata = metadata_from_work(work)
+            if work.get("doi"):
+                self.by_doi[normalize_doi(work["doi"])] = metadata
+            title = _title_key(work.get("title"))
+            if title:
+                self.by_title_year.setdefault((title, work.get("publication_year")), metadata)
+                by_title.setdefault(title, []).append(metadata)
+        # without a year match, a title is only trusted when the author has a single work with it
+        self.by_title = {title: found[0] for title, found in by_title.items() if len(found) == 1}
+
+    def match(self, record: dict) -> dict | None:
+        """OpenAlex metadata of a parsed DBLP record, None when it is not among the author's works."""
+        if record.get("doi"):
+            metadata = self.by_doi.get(normalize_doi(record["doi"]))
+            if metadata is not None:
+                return metadata
+        title = _title_key(record.get("title"))
+        if not title:
+            return None
+        try:
+            year = int(record.get("year"))
+        except (TypeError, ValueError):
+            year = None
+        return self.by_title_year.get((title, year)) or self.by_title.get(title)
+
+
+def resolve_author_id(records: list[dict], chercheur_id: int, *names: str | None) -> Counter:
+    """
+    Votes for the OpenAlex id of a researcher: the authorship matching their name in the
+    works of up to OPENALEX_DOI_BATCH_SIZE of their DOIs (one request, answered by the cache
+    when the DOIs were already looked up).
+    """
+    dois = [record["doi"] for record in records if record.get("doi")][:OPENALEX_DOI_BATCH_SIZE]
+    votes = Counter()
+    for work in fetch_openalex_works_by_doi(dois).values():
+        if work:
+            author_id = coauthor_index.own_author_id(work.get("authorships"), chercheur_id, *names)
+            if author_id:
+                votes[author_id] += 1
+    return votes
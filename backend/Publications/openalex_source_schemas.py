@@ -0,0 +1,20 @@
+from sqlmodel import SQLModel,Field
+
+
+class OpenAlexSource(SQLModel,table=True):
+    """Une source (revue, conférence...) du snapshot OpenAlex importé localement."""
+    id : str = Field(primary_key=True,description="Identifiant OpenAlex court (S123456789)")
+    nom : str | None = Field(default=None)
+    nom_normalise : str | None = Field(default=None,index=True,description="normalize_name(nom), sert à la recherche par nom")
+    issn_l : str | None = Field(default=None,index=True)
+    issn : str | None = Field(default=None)
+    e_issn : str | None = Field(default=None)
+    is_indexed_in_scopus : bool | None = None
+    homepage_url : str | None = Field(default=None)
+    works_count : int | None = Field(default=None,description="Départage les sources qui ont le même nom normalisé")
+
+
+class OpenAlexSourceIssn(SQLModel,table=True):
+    """Tous les ISSN (issn_l et issn[]) d'une source OpenAlex."""
+    issn : str = Field(primary_key=True)
+    source_id : str = Field(primary_key=True,foreign_key="openalexsource.id",ondelete="CASCADE")
@@ -0,0 +1,162 @@
+import argparse
+import glob
+import gzip
+import json
+import os
+from typing import Iterator
+from sqlalchemy import delete
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session,select
+from database import engine
+from .openalex_source_schemas import OpenAlexSource,OpenAlexSourceIssn
+from .ranking_index import normalize_name,normalize_issn
+
+# rows sent to SQLite in one INSERT ... ON CONFLICT
+IMPORT_BATCH_SIZE = 2000
+
+
+def short_source_id(source_id: str | None) -> str:
+    # "https://openalex.org/S123" -> "S123"
+    if not source_id:
+        return ""
+    return source_id.rstrip("/").rsplit("/", 1)[-1].upper()
+
+
+def _open(path: str):
+    opener = gzip.open if path.endswith(".gz") else open
+    return opener(path, "rt", encoding="UTF-8")
+
+
+def iter_snapshot_sources(path: str) -> Iterator[dict]:
+    """
+    Sources of one snapshot file: JSON Lines (the OpenAlex snapshot part_XXX.gz files, *.jsonl),
+    or for *.json(.gz) a single JSON document (a list, or an API page with "results").
+    A directory is read recursively.
+    """
+    if os.path.isdir(path):
+        for file_path in sorted(glob.glob(os.path.join(path, "**", "*"), recursive=True)):
+            if file_path.endswith((".gz", ".json", ".jsonl")):
+                yield from iter_snapshot_sources(file_path)
+        return
+
+    with _open(path) as f:
+        if path.endswith((".json", ".json.gz")):
+            data = json.load(f)
+            yield from (data.get("results", [data]) if isinstance(data, dict) else data)
+            return
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def source_row(source: dict) -> tuple[dict, set[str]] | None:
+    """OpenAlex source object -> (OpenAlexSource values, normalized ISSNs)."""
+    source_id = short_source_id(source.get("id"))
+    if not source_id:
+        return None
+    issn_list = source.get("issn") or []
+    issn_l = source.get("issn_l")
+    # same convention as the API lookup: first ISSN is the print one, second the electronic one
+    issn = issn_list[0] if issn_list else issn_l
+    e_issn = issn_list[1] if len(issn_list) > 1 else None
+    row = {
+        "id": source_id,
+        "nom": source.get("display_name"),
+        "nom_normalise": normalize_name(source.get("display_name")) or None,
+        "issn_l": issn_l,
+        "issn": issn,
+        "e_issn": e_issn,
+        "is_indexed_in_scopus": source.get("is_indexed_in_scopus"),
+        "homepage_url": source.get("homepage_url"),
+        "works_count": source.get("works_count"),
+    }
+    issns = {normalize_issn(i) for i in [issn_l, *issn_list] if i}
+    return row, issns
+
+
+def _flush(session: Session, rows: list[dict], issns: list[dict]) -> None:
+    stmt = insert(OpenAlexSource).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["id"],
+        set_={column: stmt.excluded[column] for column in rows[0] if column != "id"},
+    )
+    session.exec(stmt)
+    # a newer snapshot can drop ISSNs, rebuild the mapping of the sources we just wrote
+    session.exec(delete(OpenAlexSourceIssn).where(OpenAlexSourceIssn.source_id.in_([r["id"] for r in rows])))
+    if issns:
+        session.exec(insert(OpenAlexSourceIssn).values(issns).on_conflict_do_nothing())
+
+
+def import_sources_snapshot(paths: list[str], batch_size: int = IMPORT_BATCH_SIZE) -> int:
+    """
+    Load OpenAlex sources snapshot files into the openalexsource tables (upsert by source id).
+    Returns the number of sources imported.
+    """
+    total = 0
+    with Session(engine) as session:
+        rows, issns = [], []
+        for path in paths:
+            print(f"[INFO] Importing OpenAlex sources from {path}")
+            for source in iter_snapshot_sources(path):
+                parsed = source_row(source)
+                if parsed is None:
+                    continue
+                row, source_issns = parsed
+                rows.append(row)
+                issns.extend({"issn": i, "source_id": row["id"]} for i in source_issns)
+                if len(rows) >= batch_size:
+                    _flush(session, rows, issns)
+                    total += len(rows)
+                    rows, issns = [], []
+                    print(f"[INFO] {total} sources imported")
+        if rows:
+            _flush(session, rows, issns)
+            total += len(rows)
+        session.commit()
+    print(f"[INFO] {total} OpenAlex sources in the local snapshot")
+    return total
+
+
+def _first(statement) -> OpenAlexSource | None:
+    # the tables only exist once the migration ran, a missing snapshot is just a miss
+    try:
+        with Session(engine) as session:
+            return session.exec(statement).first()
+    except OperationalError:
+        return None
+
+
+def find_source_by_id(source_id: str | None) -> OpenAlexSource | None:
+    if not source_id:
+        return None
+    return _first(select(OpenAlexSource).where(OpenAlexSource.id == short_source_id(source_id)))
+
+
+def find_source_by_issn(issn: str | None) -> OpenAlexSource | None:
+    if not normalize_issn(issn):
+        return None
+    return _first(
+        select(OpenAlexSource)
+        .join(OpenAlexSourceIssn, OpenAlexSourceIssn.source_id == OpenAlexSource.id)
+        .where(OpenAlexSourceIssn.issn == normalize_issn(issn))
+        .order_by(OpenAlexSource.works_count.desc())
+    )
+
+
+def find_source_by_name(name: str | None) -> OpenAlexSource | None:
+    if not normalize_name(name):
+        return None
+    return _first(
+        select(OpenAlexSource)
+        .where(OpenAlexSource.nom_normalise == normalize_name(name))
+        .order_by(OpenAlexSource.works_count.desc())
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Importe un snapshot des sources OpenAlex (JSONL / JSON, .gz ou non) dans la base locale.")
+    parser.add_argument("paths", nargs="+", help="fichiers ou dossiers du snapshot (ex: openalex-snapshot/data/sources)")
+    args = parser.parse_args()
+    import_sources_snapshot(args.paths)
@@ -0,0 +1,529 @@
+import gc
+import queue
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass,field
+from datetime import datetime,timezone
+from typing import Callable,Iterable,Iterator
+from sqlalchemy import func,update
+from sqlmodel import Session,select
+from Chercheurs.schemas import Chercheur
+from database import engine
+from metrics import metrics,rss_mb
+from settings import (
+    ENRICHMENT_BATCH_SIZE,PIPELINE_QUEUE_SIZE,PIPELINE_PARSE_WORKERS,PIPELINE_OPENALEX_WORKERS,
+    PIPELINE_RANKING_WORKERS,PIPELINE_WRITE_BATCH_SIZE,PIPELINE_WRITE_INTERVAL,METRICS_REPORT_PATH,
+    RESEARCHER_BATCH_SIZE,MEMORY_RSS_LIMIT_MB,MEMORY_SAMPLE_INTERVAL,OPENALEX_AUTHOR_MODE,OPENALEX_AUTHOR_MODE_MIN_RECORDS,
+)
+from .bulk_persist import bulk_persist_publications
+from .key_registry import key_registry
+from .coauthors import coauthor_index
+from .openalex_authors import AuthorWorks,fetch_openalex_author_works,resolve_author_id
+from .venue_cache import venue_cache
+from .publications_script import (
+    open_dblp_person,is_known_record,known_dblp_records,fetch_metadata_by_doi,
+    get_metadata_from_openalex,normalize_doi,rank_publication,
+)
+
+# end of stream marker passed from one stage to the next
+_DONE = object()
+
+
+def _begin(session: Session) -> None:
+    """
+    Open the SQLite transaction explicitly. pysqlite only sends BEGIN before a DML statement,
+    a SAVEPOINT sent first would open the transaction itself and its RELEASE would commit it.
+    IMMEDIATE takes the write lock up front (waiting for the busy timeout) so a batch started by
+    a read cannot fail to upgrade when another worker process committed in between.
+    """
+    connection = session.connection()
+    if not connection.connection.driver_connection.in_transaction:
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+@dataclass
+class ResearcherSync:
+    """State of one researcher going through the pipeline, shared by all stages."""
+    id: int
+    nom: str
+    dblp_url: str
+    prenom: str | None = None
+    openalex_id: str | None = None
+    incremental: bool = True
+    known_records: dict | None = None  # loaded by the parse stage, dropped once the page is parsed
+    name: str | None = None
+    expected: int | None = None  # records sent downstream, known once the parse stage is done
+    received: int = 0  # records that reached the writer (stored or not)
+    linked: int = 0
+    peak_rss_mb: float | None = None  # process RSS while the researcher was in flight
+    author_ids: Counter = field(default_factory=Counter)  # OpenAlex ids found for the researcher in authorships
+    author_works: AuthorWorks | None = None  # all the researcher's OpenAlex works, in author mode
+    errors: list[str] = field(default_factory=list)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def fail(self, error: str) -> None:
+        with self.lock:
+            self.errors.append(error)
+
+
+@dataclass
+class StageStats:
+    name: str
+    items: int = 0
+    busy: float = 0.0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def add(self, items: int, seconds: float) -> None:
+        with self.lock:
+            self.items += items
+            self.busy += seconds
+
+
+class SyncPipeline:
+    """
+    Researchers sync as four stages connected by bounded queues, so DBLP downloads,
+    OpenAlex requests, ranking lookups and SQLite writes overlap:
+
+      parse (DBLP person pages) -> openalex (metadata by DOI batch) -> ranking -> writer
+
+    Each stage has its own thread count (PIPELINE_*_WORKERS), a full queue blocks the
+    stage feeding it. The writer is a single thread, the only one writing to the database:
+    it stores publications with the bulk engine and commits every PIPELINE_WRITE_BATCH_SIZE
+    publications (or PIPELINE_WRITE_INTERVAL seconds).
+
+    Researchers are fed lazily: a new one only enters the pipeline when a parse worker is
+    free and the process RSS is under MEMORY_RSS_LIMIT_MB.
+
+    In author mode, the parse stage pulls every OpenAlex work of a researcher with many
+    records to enrich (a few cursor pages) and the OpenAlex stage reconciles the DBLP records
+    with them, only the unmatched records go through the DOI batches.
+
+    The ranking stage matches the OpenAlex authorships against the known researchers, the
+    writer links a publication to all of them at once, and the parse stage then skips the
+    papers a co-author already stored with a link to the current researcher.
+    """
+
+    def __init__(self, on_researcher_done: Callable[[ResearcherSync], None] | None = None, author_mode: bool = OPENALEX_AUTHOR_MODE):
+        self.on_researcher_done = on_researcher_done
+        self.author_mode = author_mode
+        self.researchers_queue: queue.Queue = queue.Queue(maxsize=PIPELINE_PARSE_WORKERS)
+        self.records_queue: queue.Queue = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        self.metadata_queue: queue.Queue = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        self.publications_queue: queue.Queue = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        self.stats = {name: StageStats(name) for name in ("parse", "openalex", "ranking", "writer")}
+        self.failed = 0
+        self.not_started = 0
+        self.peak_rss_mb: float | None = None
+        # researchers fed to the pipeline and not complete yet
+        self._in_flight: dict[int, ResearcherSync] = {}
+        self._in_flight_lock = threading.Lock()
+        self._finished = threading.Event()
+
+    # --- feeding and memory bound ---
+    def _feed(self, researchers: Iterable[ResearcherSync]) -> None:
+        try:
+            for sync in researchers:
+                if not self._wait_for_memory():
+                    # reported like a failed researcher, so callers counting completions see all of them
+                    self.not_started += 1
+                    sync.fail(f"not started: RSS over MEMORY_RSS_LIMIT_MB ({MEMORY_RSS_LIMIT_MB} MB)")
+                    self._report_done(sync)
+                    continue
+                with self._in_flight_lock:
+                    self._in_flight[sync.id] = sync
+                sync.peak_rss_mb = rss_mb()
+                self.researchers_queue.put(sync)
+        finally:
+            for _ in range(PIPELINE_PARSE_WORKERS):
+                self.researchers_queue.put(_DONE)
+
+    def _wait_for_memory(self) -> bool:
+        """Block while the RSS is over the ceiling, False when it stays over it with nothing in flight."""
+        if self.not_started:
+            # the run already stopped on the ceiling
+            return False
+        if MEMORY_RSS_LIMIT_MB is None:
+            return True
+        released = False
+        while (rss := rss_mb()) is not None and rss > MEMORY_RSS_LIMIT_MB:
+            with self._in_flight_lock:
+                in_flight = len(self._in_flight)
+            if in_flight:
+                # researchers in flight free their batches once written
+                time.sleep(MEMORY_SAMPLE_INTERVAL)
+            elif not released:
+                venue_cache.clear()
+                gc.collect()
+                released = True
+            else:
+                print(f"[ERROR] RSS {rss:.0f} MB over MEMORY_RSS_LIMIT_MB ({MEMORY_RSS_LIMIT_MB} MB) with no researcher in flight, the remaining researchers are left for the next run")
+                return False
+        return True
+
+    def _watch_memory(self) -> None:
+        """Sample the RSS and keep the peak of the run and of each researcher in flight."""
+        while not self._finished.wait(MEMORY_SAMPLE_INTERVAL):
+            rss = rss_mb()
+            if rss is None:
+                return
+            self.peak_rss_mb = max(self.peak_rss_mb or 0.0, rss)
+            with self._in_flight_lock:
+                for sync in self._in_flight.values():
+                    sync.peak_rss_mb = max(sync.peak_rss_mb or 0.0, rss)
+
+    # --- stage 1: DBLP ---
+    def _parse_worker(self) -> None:
+        while (sync := self.researchers_queue.get()) is not _DONE:
+            start = time.perf_counter()
+            sent = 0
+            try:
+                if sync.incremental:
+                    # short-lived session, only the dblp key -> mdate dict is kept
+                    with Session(engine) as session:
+                        sync.known_records = known_dblp_records(session, sync.id)
+                sync.name, records = open_dblp_person(sync.dblp_url)
+                records = (record for record in records if not self._skip(sync, record))
+                if self.author_mode:
+                    # one researcher's records (no abstracts yet), needed to choose and resolve the author
+                    records = list(records)
+                    self._load_author_works(sync, records)
+                batch = []
+                for record in records:
+                    batch.append(record)
+                    if len(batch) >= ENRICHMENT_BATCH_SIZE:
+                        self.records_queue.put((sync, batch))
+                        sent += len(batch)
+                        batch = []
+                if batch:
+                    self.records_queue.put((sync, batch))
+                    sent += len(batch)
+            except Exception as e:
+                print(f"[ERROR] DBLP page of {sync.nom} failed: {e}")
+                sync.fail(f"dblp: {e}")
+            finally:
+                sync.known_records = None
+                self.stats["parse"].add(sent, time.perf_counter() - start)
+                # tell the writer how many records to wait for
+                self.publications_queue.put((sync, None, sent))
+
+    @staticmethod
+    def _skip(sync: ResearcherSync, record: dict) -> bool:
+        if sync.known_records and is_known_record(record, sync.known_records):
+            return True
+        if coauthor_index.already_linked(record.get("dblp_key"), sync.id):
+            # stored earlier in the run for a co-author, with a link to this researcher
+            metrics.count("records.linked_by_coauthor")
+            return True
+        return False
+
+    @staticmethod
+    def _load_author_works(sync: ResearcherSync, records: list[dict]) -> None:
+        """Pull the researcher's OpenAlex works when that costs fewer requests than the per-record lookups."""
+        if len(records) < OPENALEX_AUTHOR_MODE_MIN_RECORDS:
+            return
+        author_id = sync.openalex_id
+        try:
+            if author_id is None:
+                votes = resolve_author_id(records, sync.id, sync.name, f"{sync.prenom} {sync.nom}")
+                if not votes:
+                    return
+                author_id = votes.most_common(1)[0][0]
+                # stored on the researcher by the writer with the other ids seen
+                with sync.lock:
+                    sync.author_ids.update(votes)
+            works = list(fetch_openalex_author_works(author_id))
+        except Exception as e:
+            print(f"[WARN] OpenAlex works of {sync.nom} unavailable, enriching record by record: {e}")
+            return
+        sync.author_works = AuthorWorks(works)
+        print(f"[INFO] {len(works)} OpenAlex works of {sync.nom} ({author_id}) for {len(records)} DBLP records")
+
+    # --- stage 2: OpenAlex ---
+    def _openalex_worker(self) -> None:
+        while (item := self.records_queue.get()) is not _DONE:
+            sync, records = item
+            start = time.perf_counter()
+            forwarded = 0
+            try:
+                matched = self._match_author_works(sync, records)
+                try:
+                    dois = [record.get("doi") for i, record in enumerate(records) if i not in matched]
+                    prefetched = fetch_metadata_by_doi(dois) if any(dois) else {}
+                except Exception as e:
+                    print(f"[WARN] OpenAlex DOI batch failed, falling back to single lookups: {e}")
+                    prefetched = {}
+                for i, record in enumerate(records):
+                    try:
+                        metadata = matched.get(i)
+                        if metadata is None and record["doi"]:
+                            metadata = prefetched.get(normalize_doi(record["doi"]))
+                        if metadata is None:
+                            metadata = get_metadata_from_openalex(doi=record["doi"], title=record["title"])
+                    except Exception as e:
+                        sync.fail(f"openalex: {e}")
+                        metadata = None
+                    self.metadata_queue.put((sync, record, metadata))
+                    forwarded += 1
+            except Exception as e:
+                print(f"[ERROR] OpenAlex stage failed for {sync.nom}: {e}")
+                sync.fail(f"openalex: {e}")
+                # the writer counts one item per record to know when the researcher is complete
+                for record in records[forwarded:]:
+                    self.metadata_queue.put((sync, record, None))
+            self.stats["openalex"].add(len(records), time.perf_counter() - start)
+
+    @staticmethod
+    def _match_author_works(sync: ResearcherSync, records: list[dict]) -> dict[int, dict]:
+        """Records found among the researcher's OpenAlex works (author mode), by position in the batch."""
+        matched = {}
+        if sync.author_works is None:
+            return matched
+        for i, record in enumerate(records):
+            try:
+                metadata = sync.author_works.match(record)
+            except Exception as e:
+                # looked up by DOI/title like the other unmatched records
+                print(f"[WARN] Matching {record.get('title')!r} with the OpenAlex works of {sync.nom} failed: {e}")
+                continue
+            if metadata is not None:
+                matched[i] = metadata
+        metrics.count("records.matched_author_works", len(matched))
+        return matched
+
+    # --- stage 3: rankings ---
+    def _ranking_worker(self) -> None:
+        while (item := self.metadata_queue.get()) is not _DONE:
+            sync, record, metadata = item
+            start = time.perf_counter()
+            publication = None
+            if metadata is not None:
+                try:
+                    publication = rank_publication(record, sync.name, metadata)
+                    self._match_authors(sync, publication, metadata.get("authorships"))
+                except Exception as e:
+                    print(f"[ERROR] Ranking of {record.get('title')!r} failed: {e}")
+                    sync.fail(f"ranking: {e}")
+            self.publications_queue.put((sync, publication, None))
+            self.stats["ranking"].add(1, time.perf_counter() - start)
+
+    @staticmethod
+    def _match_authors(sync: ResearcherSync, publication: dict, authorships: list[dict] | None) -> None:
+        """Known researchers among the authors get linked with the publication when it is stored."""
+        coauthors = coauthor_index.match(authorships)
+        publication["coauthors"] = coauthors
+        position = publication.get("researcher_position") or {}
+        if position.get("chercheur_ordre") is None and sync.id in coauthors:
+            position["chercheur_ordre"] = coauthors[sync.id]
+        author_id = coauthor_index.own_author_id(authorships, sync.id, sync.name, f"{sync.prenom} {sync.nom}")
+        if author_id:
+            with sync.lock:
+                sync.author_ids[author_id] += 1
+
+    # --- stage 4: single writer ---
+    def _writer(self) -> None:
+        pending: dict[int, tuple[ResearcherSync, list[dict]]] = {}
+        size = 0
+        last_commit = time.monotonic()
+        with Session(engine) as session:
+            while True:
+                try:
+                    item = self.publications_queue.get(timeout=PIPELINE_WRITE_INTERVAL)
+                except queue.Empty:
+                    item = None
+                if item is _DONE:
+                    self._flush(session, pending)
+                    return
+                if item is not None:
+                    sync, publication, expected = item
+                    entry = pending.setdefault(sync.id, (sync, []))
+                    if expected is not None:
+                        sync.expected = expected
+                    else:
+                        sync.received += 1
+                        if publication is not None:
+                            entry[1].append(publication)
+                            size += 1
+                if size >= PIPELINE_WRITE_BATCH_SIZE or time.monotonic() - last_commit >= PIPELINE_WRITE_INTERVAL:
+                    pending = self._flush(session, pending)
+                    size = sum(len(publications) for _, publications in pending.values())
+                    last_commit = time.monotonic()
+
+    def _flush(self, session: Session, pending: dict) -> dict:
+        """Write and commit everything pending, returns the researchers still expecting records."""
+        if not pending:
+            return pending
+        start = time.perf_counter()
+        written = 0
+        stored = []
+        try:
+            _begin(session)
+            for sync, publications in pending.values():
+                if not publications:
+                    continue
+                try:
+                    # one savepoint per researcher: a row the database rejects only fails its researcher
+                    with session.begin_nested(), key_registry.savepoint():
+                        linked = bulk_persist_publications(session, sync.id, publications)
+                except Exception as e:
+                    print(f"[ERROR] Writing publications of {sync.nom} failed: {e}")
+                    sync.fail(f"write: {e}")
+                    continue
+                sync.linked += linked
+                written += len(publications)
+                stored.append((sync, publications))
+            finished = [sync for sync, _ in pending.values() if sync.expected is not None and sync.received >= sync.expected]
+            now = datetime.now(timezone.utc)
+            for sync in finished:
+                if sync.errors:
+                    continue
+                # same marker as persist_researcher_publications, only for complete researchers
+                session.exec(update(Chercheur).where(Chercheur.id == sync.id).values(derniere_synchronisation=now))
+            coauthor_index.learn_author_ids(session, {sync.id: sync.author_ids for sync in finished if not sync.errors})
+            with metrics.timer("db.commit"):
+                session.commit()
+            key_registry.commit()
+            for sync, publications in stored:
+                for publication in publications:
+                    coauthor_index.mark_handled((publication.get("dblp_data") or {}).get("dblp_key"), {sync.id, *publication.get("coauthors", ())})
+            # the writer session lives for the whole run, nothing may pile up in its identity map
+            session.expunge_all()
+        except Exception as e:
+            session.rollback()
+            key_registry.rollback()
+            print(f"[ERROR] Writing batch failed: {e}")
+            for sync, _ in pending.values():
+                sync.fail(f"write: {e}")
+            finished = [sync for sync, _ in pending.values() if sync.expected is not None and sync.received >= sync.expected]
+        self.stats["writer"].add(written, time.perf_counter() - start)
+
+        for sync in finished:
+            sync.author_works = None
+            with self._in_flight_lock:
+                self._in_flight.pop(sync.id, None)
+            metrics.count("researchers.failed" if sync.errors else "researchers.synced")
+            peak = f", peak RSS {sync.peak_rss_mb:.0f} MB" if sync.peak_rss_mb is not None else ""
+            if sync.errors:
+                self.failed += 1
+                print(f" Error processing {sync.nom}: {'; '.join(sync.errors[:3])}{peak}")
+            else:
+                print(f" Done with {sync.nom} ({sync.linked} publications linked{peak})")
+            self._report_done(sync)
+        finished_ids = {sync.id for sync in finished}
+        # researchers still in flight keep their entry (with no publication left) until complete
+        return {sync.id: (sync, []) for sync, _ in pending.values() if sync.id not in finished_ids}
+
+    def _report_done(self, sync: ResearcherSync) -> None:
+        # a failing callback must not stop the thread calling it (the writer, or the feeder)
+        if self.on_researcher_done is None:
+            return
+        try:
+            self.on_researcher_done(sync)
+        except Exception as e:
+            print(f"[ERROR] on_researcher_done failed for {sync.nom}: {e}")
+
+    def _start(self, target, count: int, name: str) -> list[threading.Thread]:
+        threads = [threading.Thread(target=target, name=f"{name}-{i}", daemon=True) for i in range(count)]
+        for thread in threads:
+            thread.start()
+        return threads
+
+    @staticmethod
+    def _close(threads: list[threading.Thread], next_queue: queue.Queue, next_count: int) -> None:
+        for thread in threads:
+            thread.join()
+        for _ in range(next_count):
+            next_queue.put(_DONE)
+
+    def run(self, researchers: Iterable[ResearcherSync]) -> int:
+        """
+        Sync every researcher (consumed lazily from `researchers`), returns the number of
+        researchers that failed or were not started because of the memory ceiling.
+        """
+        started = time.perf_counter()
+        feeder = threading.Thread(target=self._feed, args=(researchers,), name="feed", daemon=True)
+        feeder.start()
+        watcher = threading.Thread(target=self._watch_memory, name="memory", daemon=True)
+        watcher.start()
+        parsers = self._start(self._parse_worker, PIPELINE_PARSE_WORKERS, "parse")
+        openalex = self._start(self._openalex_worker, PIPELINE_OPENALEX_WORKERS, "openalex")
+        rankers = self._start(self._ranking_worker, PIPELINE_RANKING_WORKERS, "ranking")
+        writer = self._start(self._writer, 1, "writer")
+
+        # each stage ends once the one before it is drained
+        feeder.join()
+        self._close(parsers, self.records_queue, PIPELINE_OPENALEX_WORKERS)
+        self._close(openalex, self.metadata_queue, PIPELINE_RANKING_WORKERS)
+        self._close(rankers, self.publications_queue, 1)
+        self._close(writer, self.publications_queue, 0)
+        self._finished.set()
+
+        elapsed = time.perf_counter() - started
+        for stats in self.stats.values():
+            print(f"[INFO] stage {stats.name}: {stats.items} items, {stats.busy:.1f}s busy")
+            metrics.count(f"stage.{stats.name}.items", stats.items)
+        if self.not_started:
+            print(f"[WARN] {self.not_started} researchers not started (memory ceiling)")
+            metrics.count("researchers.not_started", self.not_started)
+        peak = max(self.peak_rss_mb or 0.0, rss_mb() or 0.0)
+        print(f"[INFO] Pipeline finished in {elapsed:.1f}s" + (f", peak RSS {peak:.0f} MB" if peak else ""))
+        return self.failed + self.not_started
+
+
+def _researchers_query(chercheur_ids: list[int] | None):
+    query = select(Chercheur.id, Chercheur.nom, Chercheur.prenom, Chercheur.dblp_url, Chercheur.openalex_id).where(Chercheur.dblp_url.is_not(None))
+    if chercheur_ids is not None:
+        query = query.where(Chercheur.id.in_(chercheur_ids))
+    return query
+
+
+def iter_researchers(chercheur_ids: list[int] | None = None, batch_size: int = RESEARCHER_BATCH_SIZE) -> Iterator[tuple]:
+    """
+    (id, nom, prenom, dblp_url, openalex_id) of the researchers to sync, read by keyset pages (id > last id) with
+    a short session per page. A yield_per cursor would keep a read transaction open for the
+    whole run, and in SQLite that read lock would stop the writer from committing.
+    """
+    last_id = -1
+    while True:
+        with Session(engine) as session:
+            rows = session.exec(_researchers_query(chercheur_ids).where(Chercheur.id > last_id).order_by(Chercheur.id).limit(batch_size)).all()
+        if not rows:
+            return
+        yield from rows
+        last_id = rows[-1][0]
+
+
+def run_pipeline(
+    incremental: bool = True,
+    chercheur_ids: list[int] | None = None,
+    on_researcher_done: Callable[[ResearcherSync], None] | None = None,
+    report_path: str | None = METRICS_REPORT_PATH,
+    author_mode: bool = OPENALEX_AUTHOR_MODE,
+) -> int:
+    """
+    Sync the researchers with a DBLP URL (all of them, or only `chercheur_ids`) through the
+    staged pipeline, returns the number of failures. `on_researcher_done` is called from the
+    writer thread each time a researcher is complete, and from the feeder thread (with an
+    error) for each researcher left unstarted by the memory ceiling. The metrics of the run are printed at
+    the end, and written as JSON to `report_path` when given. `author_mode` pulls the whole
+    OpenAlex works list of researchers with many records instead of looking them up one by one.
+    """
+    metrics.reset()
+    venue_cache.clear()
+    with Session(engine) as session:
+        total = session.exec(select(func.count()).select_from(_researchers_query(chercheur_ids).subquery())).one()
+        print(f"🔍 Found {total} researchers with DBLP URLs.")
+        key_registry.load(session)
+        coauthor_index.load(session)
+    # researchers are read page by page as the pipeline asks for them, the known records of
+    # each one are loaded by the parse stage
+    researchers = (
+        ResearcherSync(id=id, nom=nom, prenom=prenom, dblp_url=dblp_url, openalex_id=openalex_id, incremental=incremental)
+        for id, nom, prenom, dblp_url, openalex_id in iter_researchers(chercheur_ids)
+    )
+    try:
+        return SyncPipeline(on_researcher_done=on_researcher_done, author_mode=author_mode).run(researchers)
+    finally:
+        metrics.print_summary()
+        if report_path:
+            metrics.write_report(report_path)
@@ -1,4 +1,5 @@
 import requests
+from http_cache import cached_get,cached_stream
 import xml.etree.ElementTree as ET
 from sqlmodel import Session,select
 from Chercheurs.schemas import Chercheur
@@ -13,46 +14,75 @@ import pandas as pd
 import re
 
 import urllib.parse
-
-RANKINGS_DIR = "Rankings"
-METADATA_FILE = os.path.join(RANKINGS_DIR, "metadata.json")
-
-
-def get_issn_from_openalex(venue_name: str | None,full_name : str | None) -> tuple[str | None, str | None , bool | None]:
+import argparse
+from datetime import date,datetime,timezone
+from typing import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from settings import ENRICHMENT_CONCURRENCY,ENRICHMENT_BATCH_SIZE
+from metrics import metrics
+from .venue_cache import venue_cache
+from .bulk_persist import bulk_persist_publications
+from .key_registry import key_registry
+from .openalex_sources import find_source_by_id,find_source_by_issn,find_source_by_name
+from .ranking_index import RANKINGS_DIR,METADATA_FILE,normalize_name,normalize_issn,load_metadata,get_scimago_index,get_dgrsdt_index,get_core_resolver
+
+
+@metrics.timed("openalex.issn")
+def get_issn_from_openalex(venue_name: str | None,full_name : str | None,issn_request: str | None = None) -> tuple[str | None, str | None , bool | None]:
     """
-    Try to fetch ISSN and eISSN for a journal or conference from OpenAlex by name.
+    Try to fetch ISSN and eISSN for a journal or conference from OpenAlex.
     Returns (issn, eissn,is_indexed_in_scopus)
+    The local sources snapshot (openalex_sources) is searched first, by `issn_request`
+    (any ISSN of the source: ISSN-L, print or electronic) then by name, the API only on a miss.
+    Memoized for the run by normalized venue name, a failed request is not: the next
+    paper of the venue asks again.
     """
-    url = "https://api.openalex.org/sources"
-    params = {"filter": f"display_name.search:{venue_name}", "per-page": 1}
-    is_scopus_indexed = None
     try:
-        resp = requests.get(url, params=params, timeout=10)
-        resp.raise_for_status()
-        data = resp.json()
+        return _cached_issn(venue_name, full_name, issn_request)
+    except (requests.RequestException, ValueError) as e:
+        print(f"[ERROR] Failed to fetch ISSN from OpenAlex for '{venue_name}': {e}")
+        return None, None, None
 
-        results = data.get("results", [])
-        if not results:
-            if full_name:
-                return get_issn_from_openalex(venue_name=full_name,full_name=None)
-            print(f"[INFO] No ISSN found on OpenAlex for '{venue_name}'")
-            return None, None,False
-
-        ids = results[0].get("issn_l") or results[0].get("issn", [])
-        issn_list = results[0].get("issn", [])
-        is_scopus_indexed = results[0].get("is_indexed_in_scopus") 
-        if isinstance(issn_list, list):
-            issn, eissn = (issn_list[0], issn_list[1]) if len(issn_list) > 1 else (issn_list[0], None)
-        else:
-            issn, eissn = (ids, None)
 
-        return issn, eissn , is_scopus_indexed
+def _cached_issn(venue_name: str | None,full_name : str | None,issn_request: str | None = None) -> tuple[str | None, str | None , bool | None]:
+    key = ("issn", normalize_issn(issn_request), normalize_name(venue_name), normalize_name(full_name))
+    return venue_cache.get_or_resolve(key, lambda: _lookup_issn(venue_name, full_name, issn_request))
 
-    except Exception as e:
-        print(f"[ERROR] Failed to fetch ISSN from OpenAlex for '{venue_name}': {e}")
-        return None, None , is_scopus_indexed
 
+def _lookup_issn(venue_name: str | None,full_name : str | None,issn_request: str | None = None) -> tuple[str | None, str | None , bool | None]:
+    source = find_source_by_issn(issn_request) or find_source_by_name(venue_name) or find_source_by_name(full_name)
+    if source is not None:
+        return source.issn, source.e_issn, source.is_indexed_in_scopus
+    return _fetch_issn_from_openalex(venue_name, full_name)
+
+
+def _fetch_issn_from_openalex(venue_name: str | None,full_name : str | None) -> tuple[str | None, str | None , bool | None]:
+    """Request errors and invalid JSON are raised, so VenueCache does not keep them as an answer."""
+    url = "https://api.openalex.org/sources"
+    params = {"filter": f"display_name.search:{venue_name}", "per-page": 1}
+    resp = cached_get(url, params=params, timeout=10)
+    resp.raise_for_status()
+    data = resp.json()
+
+    results = data.get("results", [])
+    if not results:
+        if full_name:
+            return _cached_issn(venue_name=full_name,full_name=None)
+        print(f"[INFO] No ISSN found on OpenAlex for '{venue_name}'")
+        return None, None,False
+
+    ids = results[0].get("issn_l") or results[0].get("issn", [])
+    issn_list = results[0].get("issn", [])
+    is_scopus_indexed = results[0].get("is_indexed_in_scopus") 
+    if isinstance(issn_list, list) and issn_list:
+        issn, eissn = (issn_list[0], issn_list[1]) if len(issn_list) > 1 else (issn_list[0], None)
+    else:
+        issn, eissn = (ids or None, None)
 
+    return issn, eissn , is_scopus_indexed
+
+
+@metrics.timed("dblp.venue_name")
 def get_dblp_venue_full_name(venue_name: str) -> str | None:
     """
     Try to get the canonical (full) venue name from DBLP.
@@ -62,7 +92,7 @@ def get_dblp_venue_full_name(venue_name: str) -> str | None:
     params = {"q": venue_name, "format": "json"}
 
     try:
-        resp = requests.get(url, params=params, timeout=10)
+        resp = cached_get(url, params=params, timeout=10)
         resp.raise_for_status()
         data = resp.json()
 
@@ -78,69 +108,34 @@ def get_dblp_venue_full_name(venue_name: str) -> str | None:
         print(f"[ERROR] DBLP lookup failed for '{venue_name}': {e}")
         return None
 
-def normalize_name(name: str) -> str:
-    if not isinstance(name, str):
-        return ""
-    # lowercase
-    name = name.lower()
-    # remove punctuation
-    name = re.sub(r"[^\w\s]", "", name)
-    # collapse multiple spaces
-    name = re.sub(r"\s+", " ", name).strip()
-    return name
-
-
-def load_metadata():
-    if not os.path.exists(METADATA_FILE):
-        raise FileNotFoundError(f"metadata.json not found in {RANKINGS_DIR}")
-    with open(METADATA_FILE, "r",encoding="UTF-8") as f:
-        return json.load(f)
-
-import pandas as pd
-import os
-
-
-
+@metrics.timed("ranking.dgrsdt")
 def get_dgrsdt(issn_request: str | None, journal_name: str | None, year: int) -> str | None:
-    files = load_metadata()
-    targeted_files = files.get('dgrsdt', {}).get(str(year), {})
+    dgrsdt_index = get_dgrsdt_index()
+    targeted_files = dgrsdt_index.files_for_year(year)
     
     if not targeted_files:
         print(f"No files found for year {year}.")
         return None
 
+    normalized_issn = normalize_issn(issn_request)
     for rank, file_path in targeted_files.items():
-        if not os.path.exists(file_path):
-            print(f"[WARN] Metadata lists {file_path}, but file not found.")
+        workbook = dgrsdt_index.workbook(rank, file_path)
+        if workbook is None:
             continue
 
-        df = pd.read_excel(file_path)  # default header from first row
-        # PEDIATRICE files use a different column name
+        # PEDIATRICE files only list journal names
         if rank.upper() == "PEDIATRICE":
-            if journal_name and journal_name in df["Les Revues"].astype(str).values:
+            if journal_name and journal_name in workbook.titles:
                 print(f"Found journal in {file_path}")
                 return rank
             continue
 
         # Regular DGRSDT ranking files
-        if issn_request:
-            normalized_issn = issn_request.strip().lower().replace("-", "").replace(" ", "")
-    
-            # Normalize ISSNs in the DataFrame safely
-            df["normalized"] = (
-            df["ISSN"]
-        .astype(str)
-        .str.strip()
-        .str.lower()
-        .str.replace("-", "", regex=False)
-        .str.replace(" ", "", regex=False)
-        )
-
-            if normalized_issn in df["normalized"].values:
-                print(f"Found ISSN match in {file_path}")
-                return rank
+        if normalized_issn and normalized_issn in workbook.issns:
+            print(f"Found ISSN match in {file_path}")
+            return rank
 
-        if journal_name and journal_name in df["Journal title"].astype(str).values:
+        if journal_name and journal_name in workbook.titles:
             print(f"Found journal title match in {file_path}")
             return rank
 
@@ -150,129 +145,132 @@ def get_dgrsdt(issn_request: str | None, journal_name: str | None, year: int) ->
 
 
 
+@metrics.timed("ranking.core")
 def get_core_ranking(acronym:str | None,conference_name:str | None,year : int) -> str | None:
-    files = load_metadata()
-    years = [int(item) for item in list(files.get('core',{}.keys()))]
-    years.sort()
-
-    # Get all ranking years that are <= publication year
-    valid_years = [y for y in years if y <= int(year)]
-
-    # Choose the closest previous one, or the earliest available
-    if valid_years:
-        closest_core_year = max(valid_years)
-    else:
-        closest_core_year = years[0]
-    file_path = files['core'][str(closest_core_year)]
-    if not os.path.exists(file_path):
-        print(f"[WARN] Metadata lists {file_path}, but file not found.")
+    if not year:
         return None
-    try:
-        df = pd.read_csv(file_path,low_memory=False,delimiter=',',dtype=str)
-        df['normalized'] = df["Acronym"].apply(lambda x : x.strip().upper())
-        result = df[df['normalized'] == acronym.strip().upper()]
-
-        if result.empty:
-            print(f"[INFO] Conference '{acronym}' not found in {year}")
-
-        if result.empty and conference_name:
-            result = df[df['Title'].str.contains(conference_name, case=False, na=False)]
-        if result.empty:
-            print(f"[INFO] Conference '{conference_name}' not found in {year}") 
-            return None
-        row = result.iloc[0]
-        ranking_result = row['Rank']
-
-        return ranking_result
-    
-    except Exception as e:
-        pass
+    return get_core_resolver().resolve(acronym=acronym, conference_name=conference_name, year=year)
 
+@metrics.timed("ranking.scimago")
 def get_scimago_ranking(journal_name: str | None, issn_request: str | None, year: int) -> dict | None:
     """
     Get the Scimago ranking for a given journal and year.
-    Uses metadata.json to find the correct file for that year.
+    Uses metadata.json to find the correct file for that year; the file is parsed
+    once per process by the Scimago index and every lookup after that is a dict access.
     """
-    files = load_metadata()
-    if str(year) not in files.get("scimago", {}):
-        print(f"[INFO] No Scimago ranking file listed for {year}")
+    scimago_year = get_scimago_index().year(year)
+    if scimago_year is None:
         return None
 
-    file_path = files["scimago"][str(year)]
-    if not os.path.exists(file_path):
-        print(f"[WARN] Metadata lists {file_path}, but file not found.")
+    # Try to match journal name first
+    entry = scimago_year.find_by_title(journal_name)
+    full_name = journal_name or ""
+    index = full_name.find("(")
+    if index != -1:
+        full_name = full_name[:index].strip()
+
+    is_scopus_index = None
+    issn, e_issn, is_scopus_index = get_issn_from_openalex(venue_name=journal_name, full_name=full_name, issn_request=issn_request)
+
+    if entry is None:
+        entry = scimago_year.find_by_title(full_name)
+    if entry is None and issn:
+        entry = scimago_year.find_by_issn(issn)
+    if entry is None and issn_request:
+        entry = scimago_year.find_by_issn(issn_request)
+
+    if entry is None:
+        print(f"[INFO] Journal '{journal_name}' not found in {year}")
         return None
 
-    try:
-        df = pd.read_csv(file_path, delimiter=";", low_memory=False)
-        df["normalized"] = df["Title"].apply(normalize_name)
-
-        # Try to match journal name first
-        result = df[df["normalized"] == normalize_name(journal_name)]
-        full_name = journal_name or ""
-        index = full_name.find("(")
-        if index != -1:
-            full_name = full_name[:index].strip()
-
-        print(journal_name)
-        is_scopus_index = None
-        issn, e_issn, is_scopus_index = get_issn_from_openalex(venue_name=journal_name, full_name=full_name)
-
-        if result.empty:
-            result = df[df["normalized"] == normalize_name(full_name)]
-        if result.empty and issn:
-            result = df[df["Issn"].astype(str).str.contains(issn, na=False)]
-        if result.empty and issn_request:
-            issn_request = issn_request.replace('-','')
-            result = df[df["Issn"].astype(str).str.contains(issn_request, na=False)]
-
-        if result.empty:
-            print(f"[INFO] Journal '{journal_name}' not found in {year}")
-            return None
-
-        row = result.iloc[0]
-        issn_field = str(row.get("Issn", "")).strip()
-        split = [s.strip() for s in issn_field.split(",")] if issn_field else []
-        issn = split[0] if len(split) > 0 else None
-        e_issn = split[1] if len(split) > 1 else None
-
-        return {
-            "title": row.get("Title"),
-            "issn": issn,
-            "e_issn": e_issn,
-            "scimago_rank": row.get("SJR Best Quartile"),
-            "is_scopus_indexed": is_scopus_index,
-        }
-
-    except Exception as e:
-        print(f"[ERROR] Failed to read {file_path}: {e}")
-        return None
+    return {
+        "title": entry.title,
+        "issn": entry.issn,
+        "e_issn": entry.e_issn,
+        "scimago_rank": entry.scimago_rank,
+        "is_scopus_indexed": is_scopus_index,
+    }
 
 
 
+@metrics.timed("openalex.journal_url")
 def get_journal_url(url: str | None) -> str | None:
+    """
+    Homepage of an OpenAlex source (local snapshot first, then the API), memoized for the run
+    by source id. A failed request returns None without being memoized.
+    """
     if not url:
         return None
-
     try:
-        api_url = url.replace("https://openalex.org/", "https://api.openalex.org/")
-        response = requests.get(api_url, timeout=10)
-        response.raise_for_status()  # raises an error for 4xx/5xx responses
-        
-        data = response.json()
-        return data.get("homepage_url")
-
+        return venue_cache.get_or_resolve(("homepage", url), lambda: _lookup_journal_url(url))
     except requests.RequestException as e:
-        # Optionally log the error or handle specific cases (timeout, connection error, etc.)
         print(f"Request failed: {e}")
         return None
     except ValueError:
         # This handles invalid JSON
         print("Failed to decode JSON response.")
         return None
-    
 
 
+def _lookup_journal_url(url: str) -> str | None:
+    source = find_source_by_id(url)
+    if source is not None:
+        return source.homepage_url
+    return _fetch_journal_url(url)
+
+
+def _fetch_journal_url(url: str) -> str | None:
+    api_url = url.replace("https://openalex.org/", "https://api.openalex.org/")
+    response = cached_get(api_url, timeout=10)
+    response.raise_for_status()  # raises an error for 4xx/5xx responses
+    return response.json().get("homepage_url")
+
+
+
+OPENALEX_WORK_FIELDS = "id,doi,title,abstract_inverted_index,cited_by_count,open_access,primary_location,authorships"
+# OpenAlex accepts up to 50 values in one OR filter
+OPENALEX_DOI_BATCH_SIZE = 50
+
+
+def normalize_doi(doi: str | None) -> str:
+    # OpenAlex prefers lowercase, without "https://doi.org/"
+    if not doi:
+        return ""
+    doi = doi.strip().lower()
+    for prefix in ("https://doi.org/", "http://doi.org/", "doi:"):
+        if doi.startswith(prefix):
+            doi = doi[len(prefix):]
+    return doi
+
+
+def reconstruct_abstract(inverted_index: dict | None) -> str | None:
+    if not inverted_index:
+        return inverted_index
+    # abstract is inverted index, need to rebuild
+    abstract_words = [""] * (max(max(positions) for positions in inverted_index.values()) + 1)
+    for word, positions in inverted_index.items():
+        for pos in positions:
+            abstract_words[pos] = word
+    return " ".join(abstract_words)
+
+
+def metadata_from_work(data: dict) -> dict:
+    """Keep the fields we use from an OpenAlex work object."""
+    open_access = data.get("open_access") or {}
+    return {
+        "abstract": reconstruct_abstract(data.get("abstract_inverted_index",None)),
+        "open_access": {
+            "is_oa": open_access.get("is_oa",None),
+            "oa_status": open_access.get("oa_status",None),
+            "oa_url": open_access.get("oa_url",None),
+        },
+        "primary_location": data.get("primary_location",{}),
+        "authorships":data.get("authorships",{}),
+        "citations":data.get("cited_by_count",None)
+    }
+
+
+@metrics.timed("openalex.work")
 def get_metadata_from_openalex(doi: str | None,title : str | None) -> dict:
     """
     Fetch publication metadata from OpenAlex using a DOI.
@@ -281,11 +279,9 @@ def get_metadata_from_openalex(doi: str | None,title : str | None) -> dict:
     try:
         data = None
         if doi:
-            # Normalize DOI (OpenAlex prefers lowercase, without "https://doi.org/")
-            doi = doi.lower().replace("https://doi.org/", "")
-            url = f"https://api.openalex.org/works/doi:{doi}"
+            url = f"https://api.openalex.org/works/doi:{normalize_doi(doi)}"
             
-            response = requests.get(url)
+            response = cached_get(url,timeout=10)
             response.raise_for_status()
             data = response.json()
             
@@ -293,44 +289,21 @@ def get_metadata_from_openalex(doi: str | None,title : str | None) -> dict:
             
             encoded_title = urllib.parse.quote_plus(title)
             search_url = f"https://api.openalex.org/works?search={encoded_title}&per-page=1"
-            search_resp = requests.get(search_url,timeout=10)
+            search_resp = cached_get(search_url,timeout=10)
             search_resp.raise_for_status()
             if search_resp.status_code == 200:
                 results = search_resp.json().get("results", None)
                 if results:
                     first_result = results[0]
                     work_url = first_result["id"]
-                    response = requests.get(work_url.replace("https://openalex.org/", "https://api.openalex.org/"),timeout=10)
+                    response = cached_get(work_url.replace("https://openalex.org/", "https://api.openalex.org/"),timeout=10)
                     if response.status_code == 200:
                         data = response.json()
         
         # Extract useful fields
         if not data:
             return {'message':'Nothing'}
-        metadata = {
-            "abstract": data.get("abstract_inverted_index",None),
-            "citations": data.get("cited_by_count",None),
-            "open_access": {
-                "is_oa": data.get("open_access", {}).get("is_oa",None),
-                "oa_status": data.get("open_access", {}).get("oa_status",None),
-                "oa_url": data.get("open_access", {}).get("oa_url",None),
-            },
-            "primary_location": data.get("primary_location",{}),
-            "authorships":data.get("authorships",{}),
-            "citations":data.get("cited_by_count",None)
-        }
-        
-        # Reconstruct abstract if present in inverted index
-        if metadata["abstract"]:
-            words = metadata["abstract"]
-            # abstract is inverted index, need to rebuild
-            abstract_words = [""] * (max(max(positions) for positions in words.values()) + 1)
-            for word, positions in words.items():
-                for pos in positions:
-                    abstract_words[pos] = word
-            metadata["abstract"] = " ".join(abstract_words)
-        
-        return metadata
+        return metadata_from_work(data)
     
     except requests.exceptions.HTTPError as e:
         print(f"OpenAlex API error: {e}")
@@ -340,347 +313,388 @@ def get_metadata_from_openalex(doi: str | None,title : str | None) -> dict:
         return {}
 
 
+@metrics.timed("openalex.works_by_doi")
+def fetch_openalex_works_by_doi(dois, select: str = OPENALEX_WORK_FIELDS, use_cache: bool = True) -> dict[str, dict | None]:
+    """
+    Resolve many DOIs with `filter=doi:a|b|c` requests, OPENALEX_DOI_BATCH_SIZE DOIs per request.
+    Returns normalized DOI -> raw work. A DOI asked in a successful batch but unknown to
+    OpenAlex maps to None; DOIs of a failed batch are left out so callers can fall back
+    to get_metadata_from_openalex.
+    """
+    unique = list(dict.fromkeys(normalize_doi(doi) for doi in dois if doi))
+    # '|' and ',' are the filter separators, those DOIs stay on the single DOI path
+    batchable = [doi for doi in unique if "|" not in doi and "," not in doi]
+    works: dict[str, dict | None] = {}
+
+    for i in range(0, len(batchable), OPENALEX_DOI_BATCH_SIZE):
+        chunk = batchable[i:i + OPENALEX_DOI_BATCH_SIZE]
+        params = {"filter": "doi:" + "|".join(chunk), "per-page": 200, "select": select}
+        try:
+            response = cached_get("https://api.openalex.org/works", params=params, timeout=30, use_cache=use_cache)
+            response.raise_for_status()
+            found = {normalize_doi(work.get("doi")): work for work in response.json().get("results", [])}
+        except Exception as e:
+            print(f"[ERROR] OpenAlex batch lookup failed for {len(chunk)} DOIs: {e}")
+            continue
+        for doi in chunk:
+            works[doi] = found.get(doi)
+    return works
+
+
+def fetch_metadata_by_doi(dois) -> dict[str, dict]:
+    """Batched get_metadata_from_openalex: normalized DOI -> metadata ({} when OpenAlex has no such work)."""
+    return {
+        doi: metadata_from_work(work) if work else {}
+        for doi, work in fetch_openalex_works_by_doi(dois).items()
+    }
+
+
 
     
 
 # --- DBLP publications fetcher ---
-def fetch_dblp_publications(dblp_url: str):
-    pid = dblp_url.split("pid/")[-1].replace(".html", "")
-    api_url = f"https://dblp.org/pid/{pid}.xml"
-    
-    r = requests.get(api_url)
-    r.raise_for_status()
-    root = ET.fromstring(r.content)
-    researcher_name = root.find(".//author").text if root.find(".//author") is not None else None
+def parse_dblp_record(pub_elem: ET.Element) -> dict:
+    """Extract the fields we need from one DBLP <r> child (article, inproceedings, ...)."""
+    title_elem = pub_elem.find("title")
+    # titles may contain markup (<i>, <sub>...), keep all of their text
+    title = "".join(title_elem.itertext()) if title_elem is not None else None
+    year = pub_elem.findtext("year")
+
+    doi = None
+    url = None
+    for ee in pub_elem.findall("ee"):
+        link = ee.text
+        if link and "doi.org" in link:
+            doi = link.split("doi.org/")[-1]
+            url = link  # keep DOI link as URL too
+        elif link:
+            url = link
+
+    # fallback: build DBLP URL from key
+    if not url:
+        key = pub_elem.attrib.get("key")
+        if key:
+            url = f"https://dblp.org/rec/{key}.html"
+    return {
+        "type": pub_elem.tag,
+        "title": title,
+        "year": year,
+        "doi": doi,
+        "url": url,
+        "dblp_key": pub_elem.attrib.get("key"),
+        "dblp_mdate": parse_dblp_mdate(pub_elem.attrib.get("mdate")),
+    }
+
+
+def parse_dblp_mdate(value: str | None) -> date | None:
+    try:
+        return date.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+
+def is_known_record(record: dict, known_records: dict[str, date | None]) -> bool:
+    """True when this DBLP record is already stored for the researcher and unchanged since."""
+    key = record.get("dblp_key")
+    if not key or key not in known_records:
+        return False
+    known_mdate = known_records[key]
+    if known_mdate is None:
+        return False
+    return record.get("dblp_mdate") is None or known_mdate >= record["dblp_mdate"]
+
+
+def enrich_publication(record: dict, researcher_name: str | None, metadata: dict | None = None) -> dict:
+    """
+    OpenAlex metadata + rankings for one parsed DBLP record.
+    `metadata` is the prefetched OpenAlex metadata when the DOI went through the batch lookup.
+    Blocking: this is what the enrichment engine runs on its worker threads.
+    """
+    if metadata is None:
+        metadata = get_metadata_from_openalex(doi=record["doi"], title=record["title"])
+    return rank_publication(record, researcher_name, metadata)
+
+
+@metrics.timed("ranking.publication")
+def rank_publication(record: dict, researcher_name: str | None, metadata: dict) -> dict:
+    """
+    Second half of enrich_publication, once the OpenAlex metadata is known: researcher
+    position, venue homepage and Scimago/DGRSDT/CORE rankings.
+    """
+    pub_type = record["type"]
+    title = record["title"]
+    year = record["year"]
+    doi = record["doi"]
+    url = record["url"]
     position = None
-    pubs = []
-    for r_elem in root.findall(".//r"):
-        pub_elem = list(r_elem)[0]
-        pub_type = pub_elem.tag
-
-        title = pub_elem.findtext("title")
-        year = pub_elem.findtext("year")
-         
-
-        doi = None
-        url = None
-        for ee in pub_elem.findall("ee"):
-            link = ee.text
-            if link and "doi.org" in link:
-                doi = link.split("doi.org/")[-1]
-                url = link  # keep DOI link as URL too
-            elif link:
-                url = link
-
-        # fallback: build DBLP URL from key
-        if not url:
-            key = pub_elem.attrib.get("key")
-            if key:
-                url = f"https://dblp.org/rec/{key}.html"
-        metadata = get_metadata_from_openalex(doi=doi, title=title)
-        #-------------------------------get position of the reseaecher----------------
-        authorships = metadata.get("authorships", [])
-        if authorships:
-            for author in authorships:
-                author_name = author.get("author", {}).get("display_name", "")
-                if author_name == researcher_name:
-                    position = author.get("author_position")
-                    break
-        # --- Extract journal/source info safely ---
-        primary_location = metadata.get('primary_location',{}) or {}
-        source = primary_location.get('source', {}) or {}
-        revue = source.get('display_name', None)
-        revue_url = get_journal_url(source.get('id',None))
-        # Extract ISSN (OpenAlex may have issn_l or issn[])
-        issn_request = None
-        if 'issn_l' in source:
-            issn_request = source.get('issn_l')
-        elif 'issn' in source and isinstance(source['issn'], list) and source['issn']:
-            issn_request = source['issn'][0]
-
-        # --- Initialize placeholders ---
-        revue_data = None
-        oa_url = None
-        ranking_data = None
-
-        revue_data = get_scimago_ranking(revue, issn_request, year)
-        # --- If article, get ranking info ---
-        open_access = metadata.get("open_access", {})
-        oa_url = open_access.get("oa_url", None)
-        if not oa_url:
-            oa_url = url  # fallback
-        core_ranking = None
-        conference_name = revue or ''
-        acronym = ""
-        dgrst_rank = None
-        if pub_type == 'article':
-            dgrst_rank = get_dgrsdt(issn_request=issn_request,journal_name=revue,year=year)
-        elif pub_type == 'inproceedings':
-            match = re.search(r'\((.*?)\)', conference_name)
-
-            if match:
-                acronym = match.group(1)
-                conference_name = re.sub(r'\s*\(.*?\)\s*', ' ', conference_name).strip()
-            else:
-                acronym = "" 
-            print(f"acronym: {acronym}, conference name: {conference_name}")
-            
-            core_ranking = get_core_ranking(acronym=acronym,conference_name=conference_name,year=year)
-
-        # --- Prepare grouped outputs ---
-
-        # 1️⃣ Publication data (matches PublicationRevueBase)
-        publication_data = {
-            "titre": title,
-            "abstract": metadata.get("abstract", ""),
-            "doi": doi,
-            "annee_publication": year,
-            "url": oa_url or url or primary_location.get('landing_page_url',None),
-            "is_open_access": metadata.get("open_access", {}).get("is_oa", None),
-            "citations":metadata.get('citations')
-        }
-        researcher_position = {
-            "chercheur_ordre":position
-        }
-
-        # 2️⃣ Journal data (matches RevueBase)
-        journal_data = {
-            "nom": revue,
-            "issn": issn_request,
-            "e_issn": revue_data.get("e_issn") if revue_data else None,
-            "url": revue_url
-        }
-        conference_data = {
-            "nom": revue,
-            "url": revue_url
-        }
-
-        # 3️⃣ Ranking data (Scimago + DGRSDT placeholder)
-        ranking_data = {
-            "scimago_rank": revue_data.get("scimago_rank",None) if revue_data else None,
-            "dgrsdt_rank": dgrst_rank,  # placeholder, to be filled later
-            "is_scopus_indexed": revue_data.get("is_scopus_indexed") if revue_data else source.get('is_indexed_in_scopus')
-        }
-        conference_ranking = {
-            "scimago_rank": revue_data.get("scimago_rank") if revue_data else None,
-            "is_scopus_indexed": revue_data.get("is_scopus_indexed") if revue_data else source.get('is_indexed_in_scopus'),
-            "core_ranking":core_ranking or None
-        }
+
+    #-------------------------------get position of the reseaecher----------------
+    authorships = metadata.get("authorships", [])
+    if authorships:
+        for author in authorships:
+            author_name = author.get("author", {}).get("display_name", "")
+            if author_name == researcher_name:
+                position = author.get("author_position")
+                break
+    # --- Extract journal/source info safely ---
+    primary_location = metadata.get('primary_location',{}) or {}
+    source = primary_location.get('source', {}) or {}
+    revue = source.get('display_name', None)
+    revue_url = get_journal_url(source.get('id',None))
+    # Extract ISSN (OpenAlex may have issn_l or issn[])
+    issn_request = source.get('issn_l')
+    if not issn_request and isinstance(source.get('issn'), list) and source['issn']:
+        issn_request = source['issn'][0]
+
+    # --- Initialize placeholders ---
+    revue_data = None
+    oa_url = None
+    ranking_data = None
+
+    revue_data = get_scimago_ranking(revue, issn_request, year)
+    # --- If article, get ranking info ---
+    open_access = metadata.get("open_access", {})
+    oa_url = open_access.get("oa_url", None)
+    if not oa_url:
+        oa_url = url  # fallback
+    core_ranking = None
+    conference_name = revue or ''
+    acronym = ""
+    dgrst_rank = None
+    if pub_type == 'article':
+        dgrst_rank = get_dgrsdt(issn_request=issn_request,journal_name=revue,year=year)
+    elif pub_type == 'inproceedings':
+        match = re.search(r'\((.*?)\)', conference_name)
+
+        if match:
+            acronym = match.group(1)
+            conference_name = re.sub(r'\s*\(.*?\)\s*', ' ', conference_name).strip()
+        else:
+            acronym = "" 
+        print(f"acronym: {acronym}, conference name: {conference_name}")
         
-        pubs.append({
-            "type": pub_type,
-            "publication_data": publication_data,
-            "researcher_position":researcher_position,
-            "journal_data": journal_data if pub_type == 'article' else conference_data,
-            "ranking_data": ranking_data if pub_type == 'article' else conference_ranking
-        })
+        core_ranking = get_core_ranking(acronym=acronym,conference_name=conference_name,year=year)
+
+    # --- Prepare grouped outputs ---
+
+    # 1️⃣ Publication data (matches PublicationRevueBase)
+    publication_data = {
+        "titre": title,
+        "abstract": metadata.get("abstract", ""),
+        "doi": doi,
+        "annee_publication": year,
+        "url": oa_url or url or primary_location.get('landing_page_url',None),
+        "is_open_access": metadata.get("open_access", {}).get("is_oa", None),
+        "citations":metadata.get('citations')
+    }
+    researcher_position = {
+        "chercheur_ordre":position
+    }
+
+    # 2️⃣ Journal data (matches RevueBase)
+    journal_data = {
+        "nom": revue,
+        "issn": issn_request,
+        "e_issn": revue_data.get("e_issn") if revue_data else None,
+        "url": revue_url
+    }
+    conference_data = {
+        "nom": revue,
+        "url": revue_url
+    }
+
+    # 3️⃣ Ranking data (Scimago + DGRSDT placeholder)
+    ranking_data = {
+        "scimago_rank": revue_data.get("scimago_rank",None) if revue_data else None,
+        "dgrsdt_rank": dgrst_rank,  # placeholder, to be filled later
+        "is_scopus_indexed": revue_data.get("is_scopus_indexed") if revue_data else source.get('is_indexed_in_scopus')
+    }
+    conference_ranking = {
+        "scimago_rank": revue_data.get("scimago_rank") if revue_data else None,
+        "is_scopus_indexed": revue_data.get("is_scopus_indexed") if revue_data else source.get('is_indexed_in_scopus'),
+        "core_ranking":core_ranking or None
+    }
+    
+    return {
+        "type": pub_type,
+        "publication_data": publication_data,
+        "researcher_position":researcher_position,
+        "dblp_data": {
+            "dblp_key": record.get("dblp_key"),
+            "dblp_mdate": record.get("dblp_mdate"),
+        },
+        "journal_data": journal_data if pub_type == 'article' else conference_data,
+        "ranking_data": ranking_data if pub_type == 'article' else conference_ranking
+    }
 
-    return pubs
 
-def process_researcher_publications(session: Session, researcher: Chercheur):
+
+def enrich_publications(records: list[dict], researcher_name: str | None, concurrency: int = ENRICHMENT_CONCURRENCY) -> list[dict]:
+    """
+    Run enrich_publication for every record with at most `concurrency` in flight.
+    DOIs are first resolved in bulk (fetch_metadata_by_doi), records without a DOI
+    or from a failed batch fall back to the per-publication lookup.
+    Results come back in the same order as `records`.
+    """
+    prefetched = fetch_metadata_by_doi([record["doi"] for record in records])
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="enrich") as executor:
+        return list(executor.map(
+            lambda record: enrich_publication(
+                record, researcher_name, prefetched.get(normalize_doi(record["doi"])) if record["doi"] else None,
+            ),
+            records,
+        ))
+
+
+@metrics.timed("dblp.open")
+def open_dblp_person(dblp_url: str) -> tuple[str | None, Iterator[dict]]:
+    """
+    Start streaming a researcher's DBLP person page.
+    Returns the researcher name (read from the root element) and a generator of parsed
+    records; elements are cleared as soon as they are parsed so memory stays flat
+    whatever the size of the page.
+    """
+    pid = dblp_url.split("pid/")[-1].replace(".html", "")
+    api_url = f"https://dblp.org/pid/{pid}.xml"
+
+    stream = cached_stream(api_url)
+    events = ET.iterparse(stream, events=("start", "end"))
+    _, root = next(events)
+    researcher_name = root.attrib.get("name")
+    return researcher_name, _iter_dblp_records(stream, events, root)
+
+
+@metrics.timed("dblp.parse")
+def _iter_dblp_records(stream, events, root: ET.Element) -> Iterator[dict]:
+    depth = 1
+    try:
+        for event, elem in events:
+            if event == "start":
+                depth += 1
+                continue
+            depth -= 1
+            if depth == 1:
+                # a direct child of <dblpperson> is complete (<person>, <r>, <coauthors>...)
+                if elem.tag == "r" and len(elem):
+                    yield parse_dblp_record(elem[0])
+                root.clear()
+    finally:
+        stream.close()
+
+
+@metrics.timed("dblp.fetch_and_enrich")
+def fetch_dblp_publications(dblp_url: str, known_records: dict[str, date | None] | None = None, batch_size: int = ENRICHMENT_BATCH_SIZE) -> Iterator[dict]:
+    """
+    Stream a researcher's DBLP page and yield enriched publications.
+    Records are enriched `batch_size` at a time, so only one batch of records/abstracts
+    is held in memory. Records listed in `known_records` (dblp key -> mdate) with the
+    same mdate are dropped before any OpenAlex/ranking work.
+    """
+    researcher_name, records = open_dblp_person(dblp_url)
+    yield from enrich_records(records, researcher_name, known_records, batch_size)
+
+
+def enrich_records(records, researcher_name: str | None, known_records: dict[str, date | None] | None = None, batch_size: int = ENRICHMENT_BATCH_SIZE) -> Iterator[dict]:
+    """Enrich an iterator of parsed DBLP records batch by batch, skipping the known ones."""
+    total = skipped = 0
+    batch = []
+    for record in records:
+        total += 1
+        if known_records and is_known_record(record, known_records):
+            skipped += 1
+            continue
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield from enrich_publications(batch, researcher_name)
+            batch = []
+    if batch:
+        yield from enrich_publications(batch, researcher_name)
+
+    if known_records is not None:
+        print(f"[INFO] {skipped} of {total} DBLP records already up to date, {total - skipped} enriched")
+
+def known_dblp_records(session: Session, researcher_id: int) -> dict[str, date | None]:
+    """dblp key -> mdate of every publication already linked to the researcher."""
+    known = {}
+    for publication_model, link_model in (
+        (PublicationRevue, LienChercheurRevue),
+        (PublicationConference, LienChercheurConference),
+    ):
+        rows = session.exec(
+            select(publication_model.dblp_key, publication_model.dblp_mdate)
+            .join(link_model, link_model.publication_id == publication_model.id)
+            .where(
+                (link_model.chercheur_id == researcher_id)
+                & (publication_model.dblp_key.is_not(None))
+            )
+        ).all()
+        known.update({key: mdate for key, mdate in rows})
+    return known
+
+
+@metrics.timed("researcher.process")
+def process_researcher_publications(session: Session, researcher: Chercheur, incremental: bool = True):
     dblp = researcher.dblp_url
-    publications = fetch_dblp_publications(dblp_url=dblp)
+    known_records = known_dblp_records(session, researcher.id) if incremental else None
+    publications = fetch_dblp_publications(dblp_url=dblp, known_records=known_records)
+    persist_researcher_publications(session, researcher, publications)
 
+
+@metrics.timed("db.persist_researcher")
+def persist_researcher_publications(session: Session, researcher: Chercheur, publications):
+    """
+    Store enriched publications (venues, rankings, links) for one researcher.
+    Publications are written ENRICHMENT_BATCH_SIZE at a time by the bulk engine, all in
+    a single transaction committed with the sync marker.
+    """
+    batch = []
+    linked = 0
     for publication in publications:
-        pub_type = publication.get("type")
-        pub_data = publication.get("publication_data", {})
-        researcher_position = publication.get("researcher_position", {})
-        journal_data = publication.get("journal_data", {})
-        ranking_data = publication.get("ranking_data", {})
-        s_rank = ranking_data.get('scimago_rank')
-        if s_rank and s_rank == '-':
-            ranking_data['scimago_rank'] = None
-
-        if pub_type == "article":
-            doi = pub_data.get("doi")
-            titre = (pub_data.get("titre") or "").strip().upper()
-            revue = None
-            issn = journal_data.get("issn")
-            if issn:
-                    revue = session.exec(select(Revue).where(Revue.issn == issn)).first()
-            else:
-                    nom = journal_data.get("nom")
-                    if nom is None:
-                        continue
-                    nom = nom.strip().upper()
-                    revue = session.exec(select(Revue).where(func.trim(func.upper((Revue.nom))) == nom)).first()
-
-            if not revue:
-                    revue_base = RevueBase.model_validate(journal_data)
-                    revue = Revue(**revue_base.model_dump())
-                    session.add(revue)
-                    session.flush()  # no commit, just get the ID
-                    session.refresh(revue)
-
-            if doi:
-                existing_pub = session.exec(
-                    select(PublicationRevue).where(PublicationRevue.doi == doi)
-                ).first()
-            else:
-                if titre == '':
-                    continue
-                existing_pub = session.exec(
-                    select(PublicationRevue)
-                    .where(
-                        (func.trim(func.upper(PublicationRevue.titre)) == titre)
-                        & (PublicationRevue.annee_publication == int(pub_data.get("annee_publication", 0)))
-                    )
-                ).first()
-
-            if not existing_pub:
-                pub_base = PublicationRevueBase.model_validate(pub_data)
-                existing_pub = PublicationRevue(**pub_base.model_dump() ,revue_id = revue.id)
-                session.add(existing_pub)
-                session.flush()
-                session.refresh(existing_pub)
-
-            annee = pub_data.get("annee_publication")
-            if annee:
-                annee = int(annee)
-                revue_ranking = session.exec(
-                    select(RevueRanking)
-                    .where(
-                        (RevueRanking.annee == annee)
-                        & (RevueRanking.revue_id == revue.id)
-                    )
-                ).first()
-
-                if not revue_ranking:
-                    ranking_base = RevueRankingBase.model_validate(ranking_data)
-                    revue_ranking = RevueRanking(**ranking_base.model_dump(), revue_id = revue.id,annee=annee)
-                    session.add(revue_ranking)
-
-            lien_chercheur_publication = session.exec(
-                select(LienChercheurRevue)
-                .where(
-                    (LienChercheurRevue.chercheur_id == researcher.id)
-                    & (LienChercheurRevue.publication_id == existing_pub.id)
-                )
-            ).first()
-
-            if not lien_chercheur_publication:
-                lien_chercheur_publication = LienChercheurRevue(
-                    **researcher_position,
-                    chercheur_id =researcher.id,
-                    publication_id =existing_pub.id
-                )
-                session.add(lien_chercheur_publication)
-
-            session.commit()
-        else:
-            doi = pub_data.get("doi")
-            titre = (pub_data.get("titre") or "").strip().upper()
-            conference = None
-
-            nom = journal_data.get("nom", "") 
-            if nom is None:
-                        continue
-            nom = nom.strip().upper()
-            conference = session.exec(
-                        select(Conference).where(func.trim(func.upper(Conference.nom)) == nom)
-                    ).first()
-            if not conference :
-                        conference_base = ConferenceBase.model_validate(journal_data)
-                        conference = Conference(**conference_base.model_dump())
-                        session.add(conference)
-                        session.flush()
-                        session.refresh(conference)
-            # --- Check existing publication (by DOI or title/year) ---
-            if doi:
-                existing_pub = session.exec(
-                    select(PublicationConference).where(PublicationConference.doi == doi)
-                ).first()
-            else:
-                if titre == '':
-                    continue
-                existing_pub = session.exec(
-                    select(PublicationConference)
-                    .where(
-                        (func.trim(func.upper(PublicationConference.titre)) == titre)
-                        & (PublicationConference.annee_publication == int(pub_data.get("annee_publication", 0)))
-                    )
-                ).first()
-
-            # --- If publication doesn't exist, create it and link to conference ---
-            if not existing_pub:
-                    pub_base = PublicationConferenceBase.model_validate(pub_data)
-                    existing_pub = PublicationConference(**pub_base.model_dump(),conference_id = conference.id)
-                    session.add(existing_pub)
-                    session.flush()
-                    session.refresh(existing_pub)
-
-            # --- Handle ranking ---
-            annee = pub_data.get("annee_publication")
-            if annee:
-                    annee = int(annee)
-            conference_ranking = session.exec(
-                    select(ConferenceRanking)
-                    .where(
-                        (ConferenceRanking.annee == annee)
-                        & (ConferenceRanking.conference_id == conference.id)
-                    )
-                ).first()
-
-            if not conference_ranking:
-                    ranking_base = ConferenceRankingBase.model_validate(ranking_data)
-                    conference_ranking = ConferenceRanking(**ranking_base.model_dump(), conference_id =conference.id,annee=annee)
-                    session.add(conference_ranking)
-
-            # --- Link researcher to this publication ---
-            lien_chercheur_publication = session.exec(
-                select(LienChercheurConference)
-                .where(
-                    (LienChercheurConference.chercheur_id == researcher.id)
-                    & (LienChercheurConference.publication_id == existing_pub.id)
-                )
-            ).first()
-
-            if not lien_chercheur_publication:
-                lien_chercheur_publication = LienChercheurConference(
-                    **researcher_position,
-                    chercheur_id = researcher.id,
-                    publication_id = existing_pub.id
-                )
-                session.add(lien_chercheur_publication)
-
-            session.commit()
-
-
-
-
-
-
-
-
-def process_all_researchers():
-    """Fetch and process DBLP publications for all researchers with a valid DBLP URL."""
-    with Session(engine) as session:
-        chercheurs = session.exec(
-            select(Chercheur).where(Chercheur.dblp_url.is_not(None))
-        ).all()
-        failed = 0
-        print(f"🔍 Found {len(chercheurs)} researchers with DBLP URLs.")
+        batch.append(publication)
+        if len(batch) >= ENRICHMENT_BATCH_SIZE:
+            linked += bulk_persist_publications(session, researcher.id, batch)
+            batch = []
+    if batch:
+        linked += bulk_persist_publications(session, researcher.id, batch)
+    print(f"[INFO] {linked} publications linked to {researcher.nom}")
 
-        for researcher in chercheurs:
-            try:
-                print(f" Processing researcher: {researcher.nom} ({researcher.dblp_url})")
-                process_researcher_publications(session, researcher)
-                print(f" Done with {researcher.nom}")
-            except Exception as e:
-                session.rollback()
-                failed+=1
-                print(f" Error processing {researcher.nom}: {e}")
+    # per-researcher marker, the next incremental sync only looks at what changed since
+    researcher.derniere_synchronisation = datetime.now(timezone.utc)
+    session.add(researcher)
+    with metrics.timer("db.commit"):
+        session.commit()
+    key_registry.commit()
 
-    return failed
 
 
-            
-                    
+
+
+
+
+
+def process_all_researchers(incremental: bool = True, report_path: str | None = None, author_mode: bool | None = None):
+    """
+    Fetch and process DBLP publications for all researchers with a valid DBLP URL.
+    In incremental mode records already stored for a researcher (same DBLP key and mdate)
+    are skipped before enrichment.
+    Runs through the staged pipeline (Publications/pipeline.py), returns the number of failures.
+    `report_path` and `author_mode` override METRICS_REPORT_PATH and OPENALEX_AUTHOR_MODE.
+    """
+    # imported here, the pipeline is built on the functions of this module
+    from .pipeline import run_pipeline
+    options = {"report_path": report_path, "author_mode": author_mode}
+    return run_pipeline(incremental=incremental, **{name: value for name, value in options.items() if value is not None})
 
 
 
 # --- Example usage ---
 if __name__ == "__main__":
-    print(f"***Failed = {process_all_researchers()}")
+    parser = argparse.ArgumentParser(description="Synchronise les publications DBLP des chercheurs.")
+    parser.add_argument("--full", action="store_true", help="re-enrich every DBLP record, even unchanged ones")
+    parser.add_argument("--metrics-report", help="write the metrics of the run to this JSON file")
+    parser.add_argument("--per-record", action="store_true", help="look every DBLP record up on OpenAlex instead of pulling the author's works")
+    args = parser.parse_args()
+    failed = process_all_researchers(incremental=not args.full, report_path=args.metrics_report, author_mode=False if args.per_record else None)
+    print(f"***Failed = {failed}")
     
   
\ No newline at end of file
@@ -0,0 +1,369 @@
+import os
+import json
+import re
+import hashlib
+import pickle
+import threading
+import datetime
+from typing import NamedTuple
+import pandas as pd
+from metrics import metrics
+
+RANKINGS_DIR = "Rankings"
+METADATA_FILE = os.path.join(RANKINGS_DIR, "metadata.json")
+
+
+def normalize_name(name: str) -> str:
+    if not isinstance(name, str):
+        return ""
+    # lowercase
+    name = name.lower()
+    # remove punctuation
+    name = re.sub(r"[^\w\s]", "", name)
+    # collapse multiple spaces
+    name = re.sub(r"\s+", " ", name).strip()
+    return name
+
+
+def normalize_issn(issn: str | None) -> str:
+    """Strip dashes/spaces so '1234-567X', '1234567x' and ' 1234 567X' compare equal."""
+    if not isinstance(issn, str):
+        return ""
+    return issn.strip().upper().replace("-", "").replace(" ", "")
+
+
+def load_metadata():
+    if not os.path.exists(METADATA_FILE):
+        raise FileNotFoundError(f"metadata.json not found in {RANKINGS_DIR}")
+    with open(METADATA_FILE, "r",encoding="UTF-8") as f:
+        return json.load(f)
+
+
+class ScimagoEntry(NamedTuple):
+    title: str
+    issn: str | None
+    e_issn: str | None
+    scimago_rank: str | None
+
+
+class ScimagoYear:
+    """
+    One scimagojr yearly file, parsed once.
+    Keeps two hash maps (normalized title -> entry, single ISSN -> entry)
+    so that every lookup is a dict access instead of a DataFrame scan.
+    """
+
+    def __init__(self, file_path: str):
+        with metrics.timer("ranking.load.scimago"):
+            df = pd.read_csv(
+                file_path,
+                delimiter=";",
+                usecols=["Title", "Issn", "SJR Best Quartile"],
+                dtype={"Title": str, "Issn": str, "SJR Best Quartile": "category"},
+            )
+        self.by_title: dict[str, ScimagoEntry] = {}
+        self.by_issn: dict[str, ScimagoEntry] = {}
+
+        for title, issn_field, quartile in zip(df["Title"], df["Issn"], df["SJR Best Quartile"]):
+            issn_field = issn_field.strip() if isinstance(issn_field, str) else ""
+            split = [s.strip() for s in issn_field.split(",") if s.strip()]
+            entry = ScimagoEntry(
+                title=title,
+                issn=split[0] if len(split) > 0 else None,
+                e_issn=split[1] if len(split) > 1 else None,
+                scimago_rank=quartile if isinstance(quartile, str) else None,
+            )
+            # first row wins, same as result.iloc[0] on the old DataFrame filter
+            self.by_title.setdefault(normalize_name(title), entry)
+            for issn in split:
+                self.by_issn.setdefault(normalize_issn(issn), entry)
+
+    def find_by_title(self, name: str | None) -> ScimagoEntry | None:
+        if not name:
+            return None
+        return self.by_title.get(normalize_name(name))
+
+    def find_by_issn(self, issn: str | None) -> ScimagoEntry | None:
+        if not issn:
+            return None
+        return self.by_issn.get(normalize_issn(issn))
+
+
+class ScimagoIndex:
+    """
+    Lazy per-year cache of ScimagoYear objects.
+    A year is parsed the first time it is asked for and then reused for the rest of the process.
+    """
+
+    def __init__(self, metadata: dict | None = None):
+        self._files = (metadata or load_metadata()).get("scimago", {})
+        self._years: dict[str, ScimagoYear | None] = {}
+        self._lock = threading.Lock()
+
+    def year(self, year: int | str) -> ScimagoYear | None:
+        key = str(year)
+        if key in self._years:
+            return self._years[key]
+        with self._lock:
+            if key in self._years:
+                return self._years[key]
+            self._years[key] = self._load(key)
+            return self._years[key]
+
+    def _load(self, key: str) -> ScimagoYear | None:
+        if key not in self._files:
+            print(f"[INFO] No Scimago ranking file listed for {key}")
+            return None
+        file_path = self._files[key]
+        if not os.path.exists(file_path):
+            print(f"[WARN] Metadata lists {file_path}, but file not found.")
+            return None
+        try:
+            return ScimagoYear(file_path)
+        except Exception as e:
+            print(f"[ERROR] Failed to read {file_path}: {e}")
+            return None
+
+
+_scimago_index: ScimagoIndex | None = None
+_index_lock = threading.Lock()
+
+
+def get_scimago_index() -> ScimagoIndex:
+    """Process-wide Scimago index, shared by every researcher of a sync run."""
+    global _scimago_index
+    if _scimago_index is None:
+        with _index_lock:
+            if _scimago_index is None:
+                _scimago_index = ScimagoIndex()
+    return _scimago_index
+
+
+DGRSDT_CACHE_DIR = os.path.join(RANKINGS_DIR, ".cache", "dgrsdt")
+# bump when the compiled layout below changes so old pickles are ignored
+DGRSDT_CACHE_VERSION = 1
+
+
+class DgrsdtWorkbook(NamedTuple):
+    issns: frozenset[str]
+    titles: frozenset[str]
+
+
+def _file_checksum(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@metrics.timed("ranking.load.dgrsdt")
+def _compile_dgrsdt_workbook(file_path: str, rank: str) -> DgrsdtWorkbook:
+    df = pd.read_excel(file_path)  # default header from first row
+    # PEDIATRICE files use a different column name
+    if rank.upper() == "PEDIATRICE":
+        return DgrsdtWorkbook(issns=frozenset(), titles=frozenset(df["Les Revues"].astype(str)))
+    issns = frozenset(normalize_issn(issn) for issn in df["ISSN"].astype(str)) if "ISSN" in df else frozenset()
+    return DgrsdtWorkbook(issns=issns - {""}, titles=frozenset(df["Journal title"].astype(str)))
+
+
+class DgrsdtIndex:
+    """
+    DGRSDT workbooks compiled to pickled sets, keyed by the sha256 of the xlsx file.
+    The xlsx is only parsed when its checksum has no compiled file yet, so editing
+    or replacing a workbook rebuilds it while later runs just unpickle.
+    """
+
+    def __init__(self, metadata: dict | None = None, cache_dir: str = DGRSDT_CACHE_DIR):
+        self._files = (metadata or load_metadata()).get("dgrsdt", {})
+        self._cache_dir = cache_dir
+        # file_path -> ((mtime, size), compiled workbook)
+        self._loaded: dict[str, tuple[tuple[float, int], DgrsdtWorkbook | None]] = {}
+        self._lock = threading.Lock()
+
+    def files_for_year(self, year: int | str) -> dict[str, str]:
+        return self._files.get(str(year), {})
+
+    def workbook(self, rank: str, file_path: str) -> DgrsdtWorkbook | None:
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:
+            print(f"[WARN] Metadata lists {file_path}, but file not found.")
+            return None
+        stamp = (stat.st_mtime, stat.st_size)
+        cached = self._loaded.get(file_path)
+        if cached and cached[0] == stamp:
+            return cached[1]
+        with self._lock:
+            cached = self._loaded.get(file_path)
+            if cached and cached[0] == stamp:
+                return cached[1]
+            workbook = self._load(rank, file_path)
+            self._loaded[file_path] = (stamp, workbook)
+            return workbook
+
+    def _load(self, rank: str, file_path: str) -> DgrsdtWorkbook | None:
+        checksum = _file_checksum(file_path)
+        kind = "pediatrice" if rank.upper() == "PEDIATRICE" else "ranked"
+        compiled_path = os.path.join(self._cache_dir, f"{checksum}.{kind}.v{DGRSDT_CACHE_VERSION}.pickle")
+        if os.path.exists(compiled_path):
+            try:
+                with open(compiled_path, "rb") as f:
+                    workbook = pickle.load(f)
+                metrics.cache("dgrsdt_compiled", True)
+                return workbook
+            except Exception as e:
+                print(f"[WARN] Corrupted DGRSDT cache {compiled_path}, rebuilding: {e}")
+        metrics.cache("dgrsdt_compiled", False)
+
+        try:
+            workbook = _compile_dgrsdt_workbook(file_path, rank)
+        except Exception as e:
+            print(f"[ERROR] Failed to read {file_path}: {e}")
+            return None
+
+        os.makedirs(self._cache_dir, exist_ok=True)
+        # write then rename so a concurrent run never reads a half written pickle
+        tmp_path = f"{compiled_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(workbook, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, compiled_path)
+        return workbook
+
+
+_dgrsdt_index: DgrsdtIndex | None = None
+
+
+def get_dgrsdt_index() -> DgrsdtIndex:
+    """Process-wide DGRSDT index."""
+    global _dgrsdt_index
+    if _dgrsdt_index is None:
+        with _index_lock:
+            if _dgrsdt_index is None:
+                _dgrsdt_index = DgrsdtIndex()
+    return _dgrsdt_index
+
+
+class CoreEdition:
+    """
+    One CORE ranking edition: an acronym dictionary plus the titles, with the title fallback
+    memoized per conference name.
+    """
+
+    def __init__(self, file_path: str):
+        with metrics.timer("ranking.load.core"):
+            df = pd.read_csv(file_path, delimiter=",", usecols=["Title", "Acronym", "Rank"], dtype=str, keep_default_na=False)
+        self.titles: list[str] = list(df["Title"])
+        self.ranks: list[str] = list(df["Rank"])
+        self.by_acronym: dict[str, int] = {}
+        self._by_title: dict[str, str | None] = {}
+
+        for row, acronym in enumerate(df["Acronym"]):
+            acronym = acronym.strip().upper()
+            if acronym:
+                self.by_acronym.setdefault(acronym, row)
+
+    def find_by_acronym(self, acronym: str | None) -> str | None:
+        if not acronym or not acronym.strip():
+            return None
+        row = self.by_acronym.get(acronym.strip().upper())
+        return self.ranks[row] if row is not None else None
+
+    def find_by_title(self, conference_name: str | None) -> str | None:
+        """
+        Rank of the first title (file order) containing conference_name, case insensitive.
+        Same semantics as the former df['Title'].str.contains(conference_name, case=False):
+        the name is a regular expression, an invalid one matches nothing.
+        """
+        if not conference_name:
+            return None
+        if conference_name not in self._by_title:
+            self._by_title[conference_name] = self._search_title(conference_name)
+        return self._by_title[conference_name]
+
+    def _search_title(self, conference_name: str) -> str | None:
+        try:
+            pattern = re.compile(conference_name, re.IGNORECASE)
+        except re.error:
+            return None
+        for title, rank in zip(self.titles, self.ranks):
+            if pattern.search(title):
+                return rank
+        return None
+
+
+class CoreResolver:
+    """
+    Resolves CORE ranks without touching the CSVs on the hot path.
+    Every publication year is mapped up front to its effective edition
+    (closest previous edition, or the earliest one), and each edition is parsed once.
+    """
+
+    def __init__(self, metadata: dict | None = None):
+        self._files = (metadata or load_metadata()).get("core", {})
+        self.editions: list[int] = sorted(int(year) for year in self._files)
+        self.edition_for_year: dict[int, int] = {}
+        if self.editions:
+            last_year = max(self.editions[-1], datetime.date.today().year)
+            current = self.editions[0]
+            for year in range(self.editions[0], last_year + 1):
+                if year in self._files or str(year) in self._files:
+                    current = year
+                self.edition_for_year[year] = current
+        self._loaded: dict[int, CoreEdition | None] = {}
+        self._lock = threading.Lock()
+
+    def edition_for(self, year: int | str) -> int | None:
+        if not self.editions:
+            return None
+        year = int(year)
+        if year in self.edition_for_year:
+            return self.edition_for_year[year]
+        return self.editions[0] if year < self.editions[0] else self.editions[-1]
+
+    def edition(self, edition_year: int) -> CoreEdition | None:
+        if edition_year in self._loaded:
+            return self._loaded[edition_year]
+        with self._lock:
+            if edition_year not in self._loaded:
+                self._loaded[edition_year] = self._load(edition_year)
+            return self._loaded[edition_year]
+
+    def _load(self, edition_year: int) -> CoreEdition | None:
+        file_path = self._files[str(edition_year)]
+        if not os.path.exists(file_path):
+            print(f"[WARN] Metadata lists {file_path}, but file not found.")
+            return None
+        try:
+            return CoreEdition(file_path)
+        except Exception as e:
+            print(f"[ERROR] Failed to read {file_path}: {e}")
+            return None
+
+    def resolve(self, acronym: str | None, conference_name: str | None, year: int | str) -> str | None:
+        edition_year = self.edition_for(year)
+        if edition_year is None:
+            return None
+        edition = self.edition(edition_year)
+        if edition is None:
+            return None
+        rank = edition.find_by_acronym(acronym)
+        if rank is None:
+            print(f"[INFO] Conference '{acronym}' not found in {year}")
+            rank = edition.find_by_title(conference_name)
+        if rank is None:
+            print(f"[INFO] Conference '{conference_name}' not found in {year}")
+        return rank
+
+
+_core_resolver: CoreResolver | None = None
+
+
+def get_core_resolver() -> CoreResolver:
+    """Process-wide CORE resolver."""
+    global _core_resolver
+    if _core_resolver is None:
+        with _index_lock:
+            if _core_resolver is None:
+                _core_resolver = CoreResolver()
+    return _core_resolver
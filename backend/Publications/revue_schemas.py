@@ -1,7 +1,35 @@
 from sqlmodel import SQLModel,Field,Relationship,CheckConstraint
+from sqlalchemy import Index,event,text
 from pydantic import field_validator,HttpUrl
 from enum import Enum
+from datetime import date
 from .liens_chercheur_pub import LienChercheurRevue
+
+
+def normalized_key(value: str | None) -> str | None:
+    """
+    Stored matching key of a venue name or a publication title. Normalized in Python,
+    SQLite's UPPER() only folds ASCII letters ('é' stays 'é').
+    """
+    if value is None:
+        return None
+    return value.strip().upper()
+
+
+def normalized_issn(value: str | None) -> str | None:
+    """Stored matching key of an ISSN ('1234-567x' and '1234-567X' are the same revue)."""
+    if not value or not value.strip():
+        return None
+    return value.strip().upper()
+
+
+def normalized_doi(value: str | None) -> str | None:
+    """Stored matching key of a DOI, DOIs are case insensitive."""
+    if not value or not value.strip():
+        return None
+    return value.strip().lower()
+
+
 class DgrstRanking(str,Enum):
     AA = "A+"
     A = "A"
@@ -54,10 +82,19 @@ class PublicationRevueBase(SQLModel):
 
 class PublicationRevue(PublicationRevueBase,table=True):
     id : int | None = Field(default=None,primary_key=True)
+    titre_cle : str | None = Field(default=None,index=True,description="Titre normalisé (normalized_key) pour la déduplication")
+    doi_cle : str | None = Field(default=None,index=True,description="DOI normalisé (normalized_doi) pour la déduplication")
+    dblp_key : str | None = Field(default=None,index=True,description="Clé de l'enregistrement DBLP (journals/...)")
+    dblp_mdate : date | None = Field(default=None,description="Date de dernière modification de l'enregistrement DBLP")
     revue_id : int | None = Field(default=None,foreign_key="revue.id",ondelete="SET NULL")
     revue : "Revue" = Relationship(back_populates="publications")
     chercheur_links : list [LienChercheurRevue] = Relationship(back_populates="publication_revue")
 
+    __table_args__ = (
+        # publications without DOI are deduplicated on their title and year
+        Index("uq_publicationrevue_titre_cle_sans_doi", "titre_cle", "annee_publication", unique=True, sqlite_where=text("doi IS NULL")),
+    )
+
 
 class PublicationRevueCreate(SQLModel):
     titre: str
@@ -100,9 +137,30 @@ class RevueBase(SQLModel):
 
 class Revue(RevueBase,table=True):
     id : int | None = Field(default=None,primary_key=True)
+    nom_cle : str | None = Field(default=None,index=True,description="Nom normalisé (normalized_key) pour la déduplication")
+    issn_cle : str | None = Field(default=None,index=True,description="ISSN normalisé (normalized_issn) pour la déduplication")
     publications : list[PublicationRevue] = Relationship(back_populates="revue")
     rankings : list["RevueRanking"] = Relationship(back_populates="revue")
 
+    __table_args__ = (
+        # revues without ISSN are deduplicated on their name
+        Index("uq_revue_nom_cle_sans_issn", "nom_cle", unique=True, sqlite_where=text("issn IS NULL")),
+    )
+
+
+@event.listens_for(Revue, "before_insert")
+@event.listens_for(Revue, "before_update")
+def _set_revue_keys(mapper, connection, target):
+    target.nom_cle = normalized_key(target.nom)
+    target.issn_cle = normalized_issn(target.issn)
+
+
+@event.listens_for(PublicationRevue, "before_insert")
+@event.listens_for(PublicationRevue, "before_update")
+def _set_publication_revue_keys(mapper, connection, target):
+    target.titre_cle = normalized_key(target.titre)
+    target.doi_cle = normalized_doi(target.doi)
+
 
 class RevueUpdate(RevueBase):
     nom : str | None = None
@@ -11,10 +11,13 @@ from .liens_chercheur_pub import LienChercheurConference,LienChercheurRevue,Lien
 from .statistics_schemas import GlobalStatistics,PublicationStats,RankingStats,ResearcherStats,LabStatistics,PublicationDetailsRevue,PublicationDetailsConference,Author,safe_division,safe_value,normalize_distribution
 from sqlalchemy import func, join
 from Chercheurs.schemas import Chercheur,Labo
+from .sync_job_schemas import SyncRunStatus
+from .sync_runs import sync_runs
 publications_router = APIRouter() 
 revue_router = APIRouter()
 conference_router = APIRouter()
 statistics_router = APIRouter()
+sync_router = APIRouter()
 
 @revue_router.get("/{revue_id}", response_model=Revue)
 def get_revue_by_id(
@@ -1125,3 +1128,48 @@ def get_lab_statistics(labo_id: int, session: SessionDep):
     )
 
 
+
+
+
+
+@sync_router.post("/", response_model=SyncRunStatus, status_code=status.HTTP_202_ACCEPTED)
+def sync_all(session: SessionDep, full: bool = Query(default=False, description="Ré-enrichir toutes les publications, même inchangées")):
+    chercheur_ids = session.exec(select(Chercheur.id).where(Chercheur.dblp_url.is_not(None))).all()
+    if not chercheur_ids:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Aucun chercheur avec un lien DBLP.")
+    return sync_runs.submit("tous", None, list(chercheur_ids), incremental=not full).status()
+
+
+@sync_router.post("/chercheurs/{chercheur_id}", response_model=SyncRunStatus, status_code=status.HTTP_202_ACCEPTED)
+def sync_chercheur(session: SessionDep, chercheur_id: int = Path(..., description="Le id du chercheur à synchroniser"), full: bool = Query(default=False)):
+    chercheur = session.get(Chercheur, chercheur_id)
+    if not chercheur:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Chercheur avec ID {chercheur_id} introuvable")
+    if not chercheur.dblp_url:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Ce chercheur n'a pas de lien DBLP.")
+    return sync_runs.submit("chercheur", chercheur_id, [chercheur_id], incremental=not full).status()
+
+
+@sync_router.post("/labos/{labo_id}", response_model=SyncRunStatus, status_code=status.HTTP_202_ACCEPTED)
+def sync_labo(session: SessionDep, labo_id: int = Path(..., description="Le id du labo à synchroniser"), full: bool = Query(default=False)):
+    if not session.get(Labo, labo_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Labo avec ID {labo_id} introuvable")
+    chercheur_ids = session.exec(
+        select(Chercheur.id).where((Chercheur.labo_id == labo_id) & (Chercheur.dblp_url.is_not(None)))
+    ).all()
+    if not chercheur_ids:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Aucun chercheur de ce labo n'a de lien DBLP.")
+    return sync_runs.submit("labo", labo_id, list(chercheur_ids), incremental=not full).status()
+
+
+@sync_router.get("/", response_model=list[SyncRunStatus])
+def list_syncs():
+    return [run.status() for run in sync_runs.all()]
+
+
+@sync_router.get("/{run_id}", response_model=SyncRunStatus)
+def get_sync(run_id: str = Path(..., description="Le id retourné par POST /sync")):
+    run = sync_runs.get(run_id)
+    if not run:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Synchronisation {run_id} introuvable")
+    return run.status()
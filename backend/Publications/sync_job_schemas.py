@@ -0,0 +1,43 @@
+from sqlmodel import SQLModel,Field,CheckConstraint
+from datetime import datetime
+
+
+class SyncJob(SQLModel,table=True):
+    """Synchronisation DBLP d'un chercheur, réclamée par un worker avec un bail (lease) renouvelé par heartbeat."""
+    id : int | None = Field(default=None,primary_key=True)
+    chercheur_id : int = Field(foreign_key="chercheur.id",unique=True,ondelete="CASCADE")
+    statut : str = Field(default="pending",index=True,description="pending, running, done ou failed")
+    incremental : bool = Field(default=True,description="False pour ré-enrichir tous les enregistrements DBLP")
+    tentatives : int = Field(default=0,description="Nombre de fois où le job a été réclamé")
+    worker : str | None = Field(default=None,description="host:pid du worker qui détient le bail")
+    bail_expire_a : datetime | None = Field(default=None,description="Un autre worker peut reprendre le job après cette date")
+    heartbeat_a : datetime | None = Field(default=None)
+    derniere_erreur : str | None = Field(default=None)
+    cree_a : datetime | None = Field(default=None)
+    termine_a : datetime | None = Field(default=None)
+
+    __table_args__ = (
+        CheckConstraint(
+            "statut IN ('pending','running','done','failed')",
+            name="valid_sync_job_statut",
+        ),
+    )
+
+
+class SyncRunStatus(SQLModel):
+    """Avancement d'une synchronisation lancée depuis l'API."""
+    id : str
+    portee : str = Field(description="chercheur, labo ou tous")
+    portee_id : int | None = None
+    incremental : bool
+    statut : str = Field(description="queued, running, done ou failed")
+    total : int = Field(description="Chercheurs à synchroniser")
+    traites : int = 0
+    echecs : int = 0
+    publications : int = Field(default=0,description="Publications liées pendant la synchronisation")
+    debit : float | None = Field(default=None,description="Chercheurs traités par minute")
+    eta_secondes : float | None = Field(default=None,description="Temps restant estimé")
+    cree_a : datetime
+    demarre_a : datetime | None = None
+    termine_a : datetime | None = None
+    erreurs : list[str] = Field(default_factory=list)
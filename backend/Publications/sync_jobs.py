@@ -0,0 +1,226 @@
+import argparse
+import os
+import socket
+import threading
+from datetime import datetime,timedelta,timezone
+from multiprocessing import Process
+from sqlalchemy import case,func,text,update
+from sqlalchemy.dialects.sqlite import insert
+from sqlmodel import Session,select
+from Chercheurs.schemas import Chercheur
+from database import engine
+from metrics import metrics
+from settings import SYNC_LEASE_SECONDS,SYNC_HEARTBEAT_SECONDS,SYNC_MAX_ATTEMPTS,SYNC_WORKERS,METRICS_REPORT_PATH
+from .sync_job_schemas import SyncJob
+from .key_registry import key_registry
+from .coauthors import coauthor_index
+from .venue_cache import venue_cache
+from .pipeline import ResearcherSync,SyncPipeline
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _lease_expired(now: datetime):
+    return (SyncJob.statut == "running") & (SyncJob.bail_expire_a < now)
+
+
+def enqueue_sync(incremental: bool = True) -> int:
+    """
+    Start a sync: one pending job per researcher having a dblp_url. Jobs of a previous
+    sync are reset, except the ones a live worker is still holding.
+    Returns the number of jobs queued.
+    """
+    now = _now()
+    with Session(engine) as session:
+        chercheur_ids = session.exec(select(Chercheur.id).where(Chercheur.dblp_url.is_not(None))).all()
+        if not chercheur_ids:
+            return 0
+        stmt = insert(SyncJob.__table__).values([
+            {"chercheur_id": chercheur_id, "statut": "pending", "incremental": incremental, "tentatives": 0, "cree_a": now}
+            for chercheur_id in chercheur_ids
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["chercheur_id"],
+            set_={
+                "statut": "pending", "incremental": incremental, "tentatives": 0, "worker": None,
+                "bail_expire_a": None, "heartbeat_a": None, "derniere_erreur": None,
+                "cree_a": now, "termine_a": None,
+            },
+            where=(SyncJob.statut != "running") | (SyncJob.bail_expire_a < now),
+        )
+        session.exec(stmt)
+        session.commit()
+    print(f"[INFO] {len(chercheur_ids)} sync jobs queued")
+    return len(chercheur_ids)
+
+
+def claim_job(worker_id: str):
+    """
+    Atomically take the oldest pending job, or a running one whose lease expired
+    (its worker died), and lease it to `worker_id`.
+    Returns the (id, chercheur_id, incremental, tentatives) row, None when there is nothing to do.
+    """
+    now = _now()
+    claimable = (SyncJob.tentatives < SYNC_MAX_ATTEMPTS) & ((SyncJob.statut == "pending") | _lease_expired(now))
+    with Session(engine) as session:
+        # jobs abandoned too many times are not retried forever
+        session.exec(
+            update(SyncJob)
+            .where(_lease_expired(now) & (SyncJob.tentatives >= SYNC_MAX_ATTEMPTS))
+            .values(statut="failed", derniere_erreur="lease expired", termine_a=now)
+        )
+        next_id = select(SyncJob.id).where(claimable).order_by(SyncJob.id).limit(1).scalar_subquery()
+        # the claimable condition is repeated so a job taken in between is not claimed twice
+        job = session.exec(
+            update(SyncJob)
+            .where((SyncJob.id == next_id) & claimable)
+            .values(
+                statut="running",
+                worker=worker_id,
+                tentatives=SyncJob.tentatives + 1,
+                bail_expire_a=now + timedelta(seconds=SYNC_LEASE_SECONDS),
+                heartbeat_a=now,
+            )
+            .returning(SyncJob.id, SyncJob.chercheur_id, SyncJob.incremental, SyncJob.tentatives)
+        ).first()
+        session.commit()
+    return job
+
+
+def finish_job(job_id: int, worker_id: str, error: str | None = None) -> None:
+    now = _now()
+    if error is None:
+        values = {"statut": "done", "termine_a": now, "derniere_erreur": None}
+    else:
+        # back to pending until the attempts are exhausted
+        statut = case((SyncJob.tentatives >= SYNC_MAX_ATTEMPTS, "failed"), else_="pending")
+        values = {"statut": statut, "termine_a": now, "derniere_erreur": error[:2000]}
+    with Session(engine) as session:
+        session.exec(
+            update(SyncJob)
+            .where((SyncJob.id == job_id) & (SyncJob.worker == worker_id))
+            .values(bail_expire_a=None, **values)
+        )
+        session.commit()
+
+
+class _Heartbeat(threading.Thread):
+    """Extends the lease of a job while it is being processed."""
+
+    def __init__(self, job_id: int, worker_id: str):
+        super().__init__(daemon=True)
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(SYNC_HEARTBEAT_SECONDS):
+            now = _now()
+            try:
+                with Session(engine) as session:
+                    result = session.exec(
+                        update(SyncJob)
+                        .where((SyncJob.id == self.job_id) & (SyncJob.worker == self.worker_id) & (SyncJob.statut == "running"))
+                        .values(heartbeat_a=now, bail_expire_a=now + timedelta(seconds=SYNC_LEASE_SECONDS))
+                    )
+                    session.commit()
+            except Exception as e:
+                print(f"[WARN] Heartbeat of job {self.job_id} failed: {e}")
+                continue
+            if result.rowcount == 0:
+                print(f"[WARN] Job {self.job_id} was taken over by another worker")
+                return
+
+
+def run_job(job) -> None:
+    """
+    Sync the researcher of `job` through the staged pipeline (records are streamed to the
+    writer in bounded batches, co-authors are linked, author mode applies), raises if it failed.
+    """
+    with Session(engine) as session:
+        researcher = session.get(Chercheur, job.chercheur_id)
+        if researcher is None or not researcher.dblp_url:
+            return
+        sync = ResearcherSync(
+            id=researcher.id, nom=researcher.nom, prenom=researcher.prenom, dblp_url=researcher.dblp_url,
+            openalex_id=researcher.openalex_id, incremental=job.incremental,
+        )
+    print(f" Processing researcher: {sync.nom} ({sync.dblp_url}), attempt {job.tentatives}")
+    SyncPipeline().run([sync])
+    if sync.errors:
+        raise RuntimeError("; ".join(sync.errors[:3]))
+
+
+def run_worker() -> tuple[int, int]:
+    """Process jobs until the queue is empty. Returns (done, failed)."""
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    # connections inherited from the parent process must not be reused after a fork
+    engine.dispose(close=False)
+    with Session(engine) as session:
+        # readers do not block the writer (and the other way around) between worker processes
+        session.exec(text("PRAGMA journal_mode=WAL"))
+        key_registry.load(session)
+        coauthor_index.load(session)
+    venue_cache.clear()
+    metrics.reset()
+
+    done = failed = 0
+    while (job := claim_job(worker_id)) is not None:
+        heartbeat = _Heartbeat(job.id, worker_id)
+        heartbeat.start()
+        try:
+            run_job(job)
+            finish_job(job.id, worker_id)
+            done += 1
+        except Exception as e:
+            failed += 1
+            print(f"[ERROR] Job {job.id} (chercheur {job.chercheur_id}) failed: {e}")
+            finish_job(job.id, worker_id, error=f"{type(e).__name__}: {e}")
+        finally:
+            heartbeat.stopped.set()
+    print(f"[INFO] Worker {worker_id} finished: {done} done, {failed} failed")
+    metrics.print_summary()
+    if METRICS_REPORT_PATH:
+        # one report per worker process
+        root, ext = os.path.splitext(METRICS_REPORT_PATH)
+        metrics.write_report(f"{root}.{os.getpid()}{ext}")
+    return done, failed
+
+
+def run_workers(processes: int = SYNC_WORKERS) -> None:
+    if processes <= 1:
+        run_worker()
+        return
+    workers = [Process(target=run_worker, name=f"sync-worker-{i}") for i in range(processes)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+
+def print_status() -> None:
+    with Session(engine) as session:
+        counts = session.exec(select(SyncJob.statut, func.count()).group_by(SyncJob.statut)).all()
+        print(", ".join(f"{statut}: {count}" for statut, count in counts) or "no sync jobs")
+        for job in session.exec(select(SyncJob).where(SyncJob.statut == "failed")).all():
+            print(f"  chercheur {job.chercheur_id} ({job.tentatives} attempts): {job.derniere_erreur}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="File de synchronisation DBLP partagée entre plusieurs workers (processus ou machines).")
+    commands = parser.add_subparsers(dest="command", required=True)
+    enqueue_parser = commands.add_parser("enqueue", help="créer un job par chercheur ayant un dblp_url")
+    enqueue_parser.add_argument("--full", action="store_true", help="re-enrich every DBLP record, even unchanged ones")
+    work_parser = commands.add_parser("work", help="traiter les jobs jusqu'à ce que la file soit vide (reprend une sync interrompue)")
+    work_parser.add_argument("--processes", type=int, default=SYNC_WORKERS)
+    commands.add_parser("status", help="nombre de jobs par statut et erreurs")
+    args = parser.parse_args()
+
+    if args.command == "enqueue":
+        enqueue_sync(incremental=not args.full)
+    elif args.command == "work":
+        run_workers(args.processes)
+    else:
+        print_status()
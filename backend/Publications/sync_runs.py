@@ -0,0 +1,123 @@
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime,timezone
+from .sync_job_schemas import SyncRunStatus
+
+# finished runs kept for the status endpoints
+MAX_KEPT_RUNS = 50
+
+
+class SyncRun:
+    """A sync started from the API, updated by the pipeline's writer thread as researchers complete."""
+
+    def __init__(self, portee: str, portee_id: int | None, chercheur_ids: list[int], incremental: bool):
+        self.id = uuid.uuid4().hex
+        self.portee = portee
+        self.portee_id = portee_id
+        self.chercheur_ids = chercheur_ids
+        self.incremental = incremental
+        self.statut = "queued"
+        self.traites = 0
+        self.echecs = 0
+        self.publications = 0
+        self.erreurs: list[str] = []
+        self.cree_a = datetime.now(timezone.utc)
+        self.demarre_a: datetime | None = None
+        self.termine_a: datetime | None = None
+        self._lock = threading.Lock()
+
+    def researcher_done(self, sync) -> None:
+        with self._lock:
+            self.traites += 1
+            self.publications += sync.linked
+            if sync.errors:
+                self.echecs += 1
+                self.erreurs.append(f"{sync.nom}: {sync.errors[0]}")
+
+    def run(self) -> None:
+        # imported here so the API starts without loading the ranking indexes
+        from .pipeline import run_pipeline
+        self.statut = "running"
+        self.demarre_a = datetime.now(timezone.utc)
+        try:
+            failed = run_pipeline(incremental=self.incremental, chercheur_ids=self.chercheur_ids, on_researcher_done=self.researcher_done)
+            with self._lock:
+                # the pipeline's count is authoritative, whatever was reported researcher by researcher
+                self.echecs = max(self.echecs, failed)
+            self.statut = "done"
+        except Exception as e:
+            print(f"[ERROR] Sync run {self.id} failed: {e}")
+            self.erreurs.append(str(e))
+            self.statut = "failed"
+        finally:
+            self.termine_a = datetime.now(timezone.utc)
+
+    def status(self) -> SyncRunStatus:
+        with self._lock:
+            total = len(self.chercheur_ids)
+            debit = eta = None
+            if self.demarre_a is not None and self.traites:
+                elapsed = ((self.termine_a or datetime.now(timezone.utc)) - self.demarre_a).total_seconds()
+                if elapsed > 0:
+                    per_second = self.traites / elapsed
+                    debit = round(per_second * 60, 2)
+                    eta = round((total - self.traites) / per_second, 1) if self.statut == "running" else 0.0
+            return SyncRunStatus(
+                id=self.id,
+                portee=self.portee,
+                portee_id=self.portee_id,
+                incremental=self.incremental,
+                statut=self.statut,
+                total=total,
+                traites=self.traites,
+                echecs=self.echecs,
+                publications=self.publications,
+                debit=debit,
+                eta_secondes=eta,
+                cree_a=self.cree_a,
+                demarre_a=self.demarre_a,
+                termine_a=self.termine_a,
+                erreurs=self.erreurs[-20:],
+            )
+
+
+class SyncRunManager:
+    """
+    Runs syncs on a background thread, one at a time (the pipeline already parallelizes a
+    run, and SQLite has a single writer). Runs live in the memory of the API process.
+    """
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sync-run")
+        self._runs: OrderedDict[str, SyncRun] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, portee: str, portee_id: int | None, chercheur_ids: list[int], incremental: bool = True) -> SyncRun:
+        with self._lock:
+            # the same sync already waiting or running is returned instead of being queued twice
+            for run in self._runs.values():
+                if run.statut in ("queued", "running") and (run.portee, run.portee_id, run.incremental) == (portee, portee_id, incremental):
+                    return run
+            run = SyncRun(portee, portee_id, chercheur_ids, incremental)
+            self._runs[run.id] = run
+            while len(self._runs) > MAX_KEPT_RUNS:
+                oldest = next(iter(self._runs.values()))
+                if oldest.statut in ("queued", "running"):
+                    break
+                self._runs.popitem(last=False)
+        self._executor.submit(run.run)
+        return run
+
+    def get(self, run_id: str) -> SyncRun | None:
+        return self._runs.get(run_id)
+
+    def all(self) -> list[SyncRun]:
+        return list(reversed(self._runs.values()))
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+sync_runs = SyncRunManager()
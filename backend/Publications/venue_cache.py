@@ -0,0 +1,64 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+from metrics import metrics
+from settings import VENUE_CACHE_SIZE
+
+
+class VenueCache:
+    """
+    Bounded LRU of venue lookups (OpenAlex source homepage, ISSN by venue name...).
+    Concurrent callers asking for the same key wait for the first one instead of
+    sending the same request, so each distinct venue is resolved once per sync.
+    """
+
+    def __init__(self, maxsize: int = VENUE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data: OrderedDict[Hashable, Any] = OrderedDict()
+        self._inflight: dict[Hashable, threading.Event] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_resolve(self, key: Hashable, resolver: Callable[[], Any]) -> Any:
+        """
+        Cached value of `key`, resolved once. When the resolver raises nothing is stored:
+        the exception goes to the caller and the callers waiting on the key resolve it again.
+        """
+        while True:
+            with self._lock:
+                if key in self._data:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    metrics.cache("venue", True)
+                    return self._data[key]
+                event = self._inflight.get(key)
+                if event is None:
+                    event = self._inflight[key] = threading.Event()
+                    self.misses += 1
+                    metrics.cache("venue", False)
+                    break
+            # someone else is resolving this venue, wait and read their result
+            event.wait()
+
+        try:
+            value = resolver()
+            with self._lock:
+                self._data[key] = value
+                if len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            event.set()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+# shared by every researcher of a run, process_all_researchers clears it at the start
+venue_cache = VenueCache()
@@ -2,7 +2,7 @@ from sqlmodel import create_engine,SQLModel,Session,text
 from fastapi import Depends
 from typing import Annotated
 DATABASE_URL = 'sqlite:///example.db'
-engine = create_engine(DATABASE_URL,echo=True,connect_args={'check_same_thread':False})
+engine = create_engine(DATABASE_URL,echo=True,connect_args={'check_same_thread':False,'timeout':30})
 def init_db():
     with engine.connect() as connection:
         connection.execute(text("PRAGMA foreign_keys=ON"))
@@ -0,0 +1,280 @@
+import io
+import sqlite3
+import threading
+import time
+import zlib
+import urllib.parse
+import requests
+import http_client
+from metrics import metrics
+from settings import HTTP_CACHE_PATH,HTTP_CACHE_ENABLED,HTTP_CACHE_TTL
+
+# (host, path prefix) -> endpoint family, first match wins
+ENDPOINT_FAMILIES = [
+    ("api.openalex.org", "/w", "openalex_works"),  # /works?... and /W123456
+    ("api.openalex.org", "/s", "openalex_sources"),  # /sources?... and /S123456
+    ("dblp.org", "/pid/", "dblp_person"),
+    ("dblp.org", "/search/", "dblp_search"),
+]
+
+_local = threading.local()
+# key -> event of the request currently fetching it, concurrent callers wait for it instead of sending it again
+_inflight: dict[str, threading.Event] = {}
+_inflight_lock = threading.Lock()
+
+
+def normalize_request(url: str, params: dict | None = None) -> str:
+    """
+    Canonical form of a GET request: lowercase scheme/host, params merged into
+    the query string and sorted, so the same request always maps to the same key.
+    """
+    parts = urllib.parse.urlsplit(url)
+    query = urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+    if params:
+        query += [(k, str(v)) for k, v in params.items() if v is not None]
+    query.sort()
+    return urllib.parse.urlunsplit((
+        parts.scheme.lower(),
+        parts.netloc.lower(),
+        parts.path,
+        urllib.parse.urlencode(query),
+        "",
+    ))
+
+
+def endpoint_family(url: str) -> str:
+    parts = urllib.parse.urlsplit(url)
+    host, path = parts.netloc.lower(), parts.path.lower()
+    for family_host, prefix, family in ENDPOINT_FAMILIES:
+        if host == family_host and path.startswith(prefix):
+            return family
+    return "default"
+
+
+def _connection() -> sqlite3.Connection:
+    # one connection per thread, the enrichment code calls us from worker threads
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(HTTP_CACHE_PATH, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                family TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                encoding TEXT,
+                content_type TEXT,
+                body BLOB NOT NULL,
+                fetched_at REAL NOT NULL,
+                expires_at REAL NOT NULL
+            )"""
+        )
+        conn.execute("DELETE FROM responses WHERE expires_at < ?", (time.time(),))
+        conn.commit()
+        _local.conn = conn
+    return conn
+
+
+def _build_response(key: str, status: int, encoding: str | None, content_type: str | None, body: bytes) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status
+    response.url = key
+    response.encoding = encoding
+    response._content = zlib.decompress(body)
+    if content_type:
+        response.headers["Content-Type"] = content_type
+    response.from_cache = True
+    return response
+
+
+def lookup(key: str) -> requests.Response | None:
+    row = _connection().execute(
+        "SELECT status, encoding, content_type, body FROM responses WHERE key = ? AND expires_at >= ?",
+        (key, time.time()),
+    ).fetchone()
+    if row is None:
+        return None
+    return _build_response(key, *row)
+
+
+def store(key: str, family: str, response: requests.Response) -> None:
+    _store_blob(key, family, response, zlib.compress(response.content, 6))
+
+
+def _store_blob(key: str, family: str, response: requests.Response, blob: bytes) -> None:
+    now = time.time()
+    ttl = HTTP_CACHE_TTL.get(family, HTTP_CACHE_TTL["default"])
+    conn = _connection()
+    conn.execute(
+        "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            key,
+            family,
+            response.status_code,
+            response.encoding,
+            response.headers.get("Content-Type"),
+            blob,
+            now,
+            now + ttl,
+        ),
+    )
+    conn.commit()
+
+
+def cached_get(url: str, params: dict | None = None, use_cache: bool = True, **kwargs) -> requests.Response:
+    """
+    Drop-in replacement for requests.get backed by the local response cache,
+    misses go through the pooled http_client.
+    Only successful (200) responses are stored, errors are always re-requested.
+    Concurrent identical requests are sent once, the other callers read the stored response.
+    """
+    if not (use_cache and HTTP_CACHE_ENABLED):
+        return http_client.get(url, params=params, **kwargs)
+
+    key = normalize_request(url, params)
+    try:
+        cached = lookup(key)
+    except sqlite3.Error as e:
+        print(f"[WARN] HTTP cache unavailable: {e}")
+        return http_client.get(url, params=params, **kwargs)
+    family = endpoint_family(url)
+    metrics.cache(f"http:{family}", cached is not None)
+    if cached is not None:
+        return cached
+
+    with _inflight_lock:
+        event = _inflight.get(key)
+        if event is None:
+            _inflight[key] = threading.Event()
+    if event is not None:
+        # same request already on the wire (another researcher with the same paper...)
+        event.wait()
+        cached = lookup(key)
+        if cached is not None:
+            return cached
+        return http_client.get(url, params=params, **kwargs)
+
+    try:
+        response = http_client.get(url, params=params, **kwargs)
+        if response.status_code == 200:
+            try:
+                store(key, family, response)
+            except sqlite3.Error as e:
+                print(f"[WARN] Could not store {key} in HTTP cache: {e}")
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key).set()
+    response.from_cache = False
+    return response
+
+
+class _DecompressingReader(io.RawIOBase):
+    """Reads a cached body back chunk by chunk instead of inflating it all at once."""
+
+    def __init__(self, blob: bytes, chunk_size: int = 64 * 1024):
+        self._decompressor = zlib.decompressobj()
+        self._blob = memoryview(blob)
+        self._pos = 0
+        self._chunk_size = chunk_size
+        self._pending = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending:
+            if self._pos >= len(self._blob):
+                self._pending = self._decompressor.flush()
+                if not self._pending:
+                    return 0
+                break
+            chunk = self._blob[self._pos:self._pos + self._chunk_size]
+            self._pos += self._chunk_size
+            self._pending = self._decompressor.decompress(chunk)
+        n = min(len(buffer), len(self._pending))
+        buffer[:n] = self._pending[:n]
+        self._pending = self._pending[n:]
+        return n
+
+
+class _CachingReader(io.RawIOBase):
+    """
+    Passes a streamed response body through while compressing it on the side,
+    the compressed copy is written to the cache once the body has been fully read.
+    """
+
+    def __init__(self, response: requests.Response, key: str, family: str):
+        self._response = response
+        self._raw = response.raw
+        self._raw.decode_content = True
+        self._key = key
+        self._family = family
+        self._compressor = zlib.compressobj(6)
+        self._parts: list[bytes] = []
+        self._finished = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self._raw.read(len(buffer))
+        if not data:
+            self._finish()
+            return 0
+        self._parts.append(self._compressor.compress(data))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def _finish(self) -> None:
+        if self._finished:
+            return
+        self._finished = True
+        self._parts.append(self._compressor.flush())
+        try:
+            _store_blob(self._key, self._family, self._response, b"".join(self._parts))
+        except sqlite3.Error as e:
+            print(f"[WARN] Could not store {self._key} in HTTP cache: {e}")
+        self._parts = []
+
+    def close(self) -> None:
+        self._response.close()
+        super().close()
+
+
+def cached_stream(url: str, params: dict | None = None, use_cache: bool = True, **kwargs) -> io.BufferedReader:
+    """
+    Like cached_get but returns the body as a file object that can be consumed
+    incrementally (ET.iterparse...). Raises requests.HTTPError on non 200 responses.
+    """
+    key = normalize_request(url, params)
+    if use_cache and HTTP_CACHE_ENABLED:
+        try:
+            row = _connection().execute(
+                "SELECT body FROM responses WHERE key = ? AND status = 200 AND expires_at >= ?",
+                (key, time.time()),
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"[WARN] HTTP cache unavailable: {e}")
+            row = None
+        metrics.cache(f"http:{endpoint_family(url)}", row is not None)
+        if row is not None:
+            return io.BufferedReader(_DecompressingReader(row[0]))
+
+    response = http_client.get(url, params=params, stream=True, **kwargs)
+    if response.status_code != 200:
+        response.close()
+        response.raise_for_status()
+        raise requests.HTTPError(f"{response.status_code} for url: {url}", response=response)
+    if not (use_cache and HTTP_CACHE_ENABLED):
+        response.raw.decode_content = True
+        return io.BufferedReader(response.raw)
+    return io.BufferedReader(_CachingReader(response, key, endpoint_family(url)))
+
+
+def clear(family: str | None = None) -> None:
+    conn = _connection()
+    if family:
+        conn.execute("DELETE FROM responses WHERE family = ?", (family,))
+    else:
+        conn.execute("DELETE FROM responses")
+    conn.commit()
@@ -0,0 +1,103 @@
+import threading
+import urllib.parse
+import requests
+import rate_limiter
+import time
+from metrics import metrics
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from settings import HTTP_TIMEOUT,HTTP_MAX_RETRIES,HTTP_BACKOFF_FACTOR,HTTP_POOL_SIZE,HTTP_USER_AGENT
+
+# transient status codes retried by urllib3, 429 is handled in get() so it goes through the rate limiter
+RETRY_STATUSES = (500, 502, 503, 504)
+
+_sessions: dict[str, requests.Session] = {}
+_lock = threading.Lock()
+
+
+class _UpstreamRetry(Retry):
+    # urllib3 would otherwise sleep on a 429 Retry-After itself, without telling the rate limiter
+    RETRY_AFTER_STATUS_CODES = frozenset({413, 503})
+
+
+def _retry_policy() -> Retry:
+    return _UpstreamRetry(
+        total=HTTP_MAX_RETRIES,
+        backoff_factor=HTTP_BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        # hand the last response back instead of raising, callers check status codes
+        raise_on_status=False,
+    )
+
+
+def _new_session() -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE, max_retries=_retry_policy())
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        "User-Agent": HTTP_USER_AGENT,
+        "Accept-Encoding": "gzip, deflate",
+    })
+    return session
+
+
+def session_for(url: str) -> requests.Session:
+    """One persistent keep-alive session per host (api.openalex.org, dblp.org, ...)."""
+    host = urllib.parse.urlsplit(url).netloc.lower()
+    session = _sessions.get(host)
+    if session is None:
+        with _lock:
+            session = _sessions.get(host)
+            if session is None:
+                session = _sessions[host] = _new_session()
+    return session
+
+
+def get(url: str, params: dict | None = None, timeout: float | None = None, **kwargs) -> requests.Response:
+    """
+    requests.get through the pooled session of the target host,
+    with the shared retry/backoff policy and a default timeout.
+    Every attempt takes a token from the host's rate limiter; a 429 pushes
+    its Retry-After back into the limiter so all workers slow down together.
+    """
+    host = urllib.parse.urlsplit(url).netloc.lower()
+    session = session_for(url)
+    for attempt in range(HTTP_MAX_RETRIES + 1):
+        rate_limiter.acquire(host)
+        start = time.perf_counter()
+        try:
+            response = session.get(url, params=params, timeout=timeout or HTTP_TIMEOUT, **kwargs)
+        except requests.exceptions.RequestException as e:
+            metrics.observe(f"http:{host}", time.perf_counter() - start, error=True)
+            metrics.http_status(host, type(e).__name__)
+            raise
+        # time to the response headers, streamed bodies are read afterwards
+        metrics.observe(f"http:{host}", time.perf_counter() - start)
+        metrics.http_status(host, response.status_code)
+        if response.status_code != 429 or attempt == HTTP_MAX_RETRIES:
+            return response
+        retry_after = _retry_after(response)
+        print(f"Rate limited by {host}. Waiting {retry_after or 'a moment'} seconds before retry...")
+        response.close()
+        rate_limiter.penalize(host, retry_after)
+    return response
+
+
+def _retry_after(response: requests.Response) -> float | None:
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return Retry().parse_retry_after(value)
+    except Exception:
+        return None
+
+
+def close_all() -> None:
+    with _lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
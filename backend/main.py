@@ -1,5 +1,6 @@
 from fastapi import FastAPI
-from Publications.routers import publications_router,revue_router,conference_router,statistics_router
+from Publications.routers import publications_router,revue_router,conference_router,statistics_router,sync_router
+from Publications.sync_runs import sync_runs
 from Chercheurs.routers import chercheurs_router
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
@@ -9,6 +10,7 @@ from database import init_db
 async def lifespan(app:FastAPI):
     init_db()
     yield
+    sync_runs.shutdown()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -38,4 +40,5 @@ app.include_router(chercheurs_router, prefix="/chercheurs")
 app.include_router(revue_router,prefix='/revue')
 app.include_router(conference_router,prefix='/conference')
 app.include_router(statistics_router,prefix='/statistics')
+app.include_router(sync_router,prefix='/sync')
 
@@ -0,0 +1,238 @@
+import bisect
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime,timezone
+from settings import METRICS_ENABLED
+
+try:
+    import psutil
+except ImportError:  # optional, /proc/self/statm is read instead (Linux)
+    psutil = None
+
+# upper bounds of the latency histogram buckets, in milliseconds (the last bucket is open)
+LATENCY_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+def _round(ms: float | None) -> float | None:
+    return round(ms, 2) if ms is not None else None
+
+
+class Histogram:
+    """Latency histogram with fixed buckets, memory does not grow with the number of calls."""
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min: float | None = None
+        self.max: float | None = None
+
+    def observe(self, ms: float) -> None:
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        self.min = ms if self.min is None else min(self.min, ms)
+        self.max = ms if self.max is None else max(self.max, ms)
+
+    def percentile(self, p: float) -> float | None:
+        """Upper bound of the bucket holding the p-th percentile (the max for the open bucket)."""
+        if not self.count:
+            return None
+        rank = p / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if n and seen >= rank:
+                return min(LATENCY_BUCKETS_MS[i], self.max) if i < len(LATENCY_BUCKETS_MS) else self.max
+        return self.max
+
+    def to_dict(self) -> dict:
+        labels = [f"<={bound}ms" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+        return {
+            "count": self.count,
+            "total_ms": round(self.total, 1),
+            "mean_ms": round(self.total / self.count, 2) if self.count else None,
+            "min_ms": _round(self.min),
+            "max_ms": _round(self.max),
+            "p50_ms": _round(self.percentile(50)),
+            "p95_ms": _round(self.percentile(95)),
+            "p99_ms": _round(self.percentile(99)),
+            "buckets": {label: n for label, n in zip(labels, self.buckets) if n},
+        }
+
+
+class Metrics:
+    """
+    Process-wide counters of a sync run: latency histograms and call counts per operation,
+    cache hits/misses, HTTP status codes per host and rows written per table.
+    Thread safe, every recording method is a no-op when METRICS_ENABLED is False.
+    """
+
+    def __init__(self, enabled: bool = METRICS_ENABLED):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.latencies: dict[str, Histogram] = {}
+            self.errors: dict[str, int] = {}
+            self.counters: dict[str, int] = {}
+            self.caches: dict[str, list[int]] = {}
+            self.http_statuses: dict[str, dict[str, int]] = {}
+            self.rows: dict[str, int] = {}
+            self.started_at = datetime.now(timezone.utc)
+            self._started = time.perf_counter()
+
+    # --- recording ---
+    def observe(self, name: str, seconds: float, error: bool = False) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self.latencies.get(name)
+            if histogram is None:
+                histogram = self.latencies[name] = Histogram()
+            histogram.observe(seconds * 1000)
+            if error:
+                self.errors[name] = self.errors.get(name, 0) + 1
+
+    @contextmanager
+    def timer(self, name: str):
+        start = time.perf_counter()
+        error = False
+        try:
+            yield
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - start, error)
+
+    def timed(self, name: str):
+        """
+        Decorator recording the latency of each call under `name`. For generator functions
+        only the time spent producing items is counted, not the time the consumer holds them.
+        """
+        def decorator(func):
+            if inspect.isgeneratorfunction(func):
+                @functools.wraps(func)
+                def generator_wrapper(*args, **kwargs):
+                    busy = 0.0
+                    error = False
+                    generator = func(*args, **kwargs)
+                    try:
+                        while True:
+                            start = time.perf_counter()
+                            try:
+                                item = next(generator)
+                            except StopIteration:
+                                busy += time.perf_counter() - start
+                                return
+                            busy += time.perf_counter() - start
+                            yield item
+                    except BaseException as e:
+                        error = not isinstance(e, GeneratorExit)
+                        raise
+                    finally:
+                        generator.close()
+                        self.observe(name, busy, error)
+                return generator_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def count(self, name: str, n: int = 1) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def cache(self, name: str, hit: bool) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            counts = self.caches.setdefault(name, [0, 0])
+            counts[0 if hit else 1] += 1
+
+    def http_status(self, host: str, status: int | str) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            statuses = self.http_statuses.setdefault(host, {})
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    def rows_written(self, table: str, n: int) -> None:
+        if not self.enabled or not n:
+            return
+        with self._lock:
+            self.rows[table] = self.rows.get(table, 0) + n
+
+    # --- reporting ---
+    def report(self) -> dict:
+        with self._lock:
+            return {
+                "started_at": self.started_at.isoformat(),
+                "elapsed_s": round(time.perf_counter() - self._started, 2),
+                "latencies": {
+                    name: {**histogram.to_dict(), "errors": self.errors.get(name, 0)}
+                    for name, histogram in sorted(self.latencies.items())
+                },
+                "counters": dict(sorted(self.counters.items())),
+                "caches": {
+                    name: {"hits": hits, "misses": misses, "hit_ratio": round(hits / (hits + misses), 3) if hits + misses else None}
+                    for name, (hits, misses) in sorted(self.caches.items())
+                },
+                "http_statuses": {host: dict(sorted(statuses.items())) for host, statuses in sorted(self.http_statuses.items())},
+                "rows_written": dict(sorted(self.rows.items())),
+            }
+
+    def print_summary(self) -> None:
+        if not self.enabled:
+            return
+        report = self.report()
+        print(f"[INFO] Metrics of the run ({report['elapsed_s']}s)")
+        if report["latencies"]:
+            print(f"  {'operation':<32}{'calls':>8}{'errors':>8}{'total s':>10}{'mean ms':>10}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>10}")
+            for name, stats in report["latencies"].items():
+                print(
+                    f"  {name:<32}{stats['count']:>8}{stats['errors']:>8}{stats['total_ms'] / 1000:>10.2f}"
+                    f"{stats['mean_ms']:>10.1f}{stats['p50_ms']:>9.0f}{stats['p95_ms']:>9.0f}{stats['max_ms']:>10.1f}"
+                )
+        for name, stats in report["caches"].items():
+            print(f"  cache {name}: {stats['hits']} hits, {stats['misses']} misses ({(stats['hit_ratio'] or 0) * 100:.0f}% hit)")
+        for host, statuses in report["http_statuses"].items():
+            print(f"  http {host}: " + ", ".join(f"{status} x{n}" for status, n in statuses.items()))
+        for name, n in report["counters"].items():
+            print(f"  {name}: {n}")
+        if report["rows_written"]:
+            print("  rows written: " + ", ".join(f"{table} {n}" for table, n in report["rows_written"].items()))
+
+    def write_report(self, path: str) -> None:
+        """JSON report of the run, to compare runs with each other."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+        print(f"[INFO] Metrics report written to {path}")
+
+
+# one instance per process, run_pipeline resets it at the start of a run
+metrics = Metrics()
+
+
+def rss_mb() -> float | None:
+    """Resident memory of this process in MB, None when it cannot be read on this platform."""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / 2**20
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
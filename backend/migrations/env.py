@@ -9,6 +9,8 @@ import Chercheurs.schemas
 import Publications.revue_schemas
 import Publications.conference_schemas
 import Publications.liens_chercheur_pub
+import Publications.openalex_source_schemas
+import Publications.sync_job_schemas
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
@@ -0,0 +1,44 @@
+"""incremental dblp sync: dblp key/mdate on publications, last sync on chercheur
+
+Revision ID: 3f1c2a7d9e04
+Revises: 9a0310f5fced
+Create Date: 2026-10-18 09:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c2a7d9e04'
+down_revision: Union[str, Sequence[str], None] = '9a0310f5fced'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('publicationrevue', sa.Column('dblp_key', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    op.add_column('publicationrevue', sa.Column('dblp_mdate', sa.Date(), nullable=True))
+    op.create_index(op.f('ix_publicationrevue_dblp_key'), 'publicationrevue', ['dblp_key'], unique=False)
+    op.add_column('publicationconference', sa.Column('dblp_key', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    op.add_column('publicationconference', sa.Column('dblp_mdate', sa.Date(), nullable=True))
+    op.create_index(op.f('ix_publicationconference_dblp_key'), 'publicationconference', ['dblp_key'], unique=False)
+    op.add_column('chercheur', sa.Column('derniere_synchronisation', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('chercheur') as batch_op:
+        batch_op.drop_column('derniere_synchronisation')
+    op.drop_index(op.f('ix_publicationconference_dblp_key'), table_name='publicationconference')
+    with op.batch_alter_table('publicationconference') as batch_op:
+        batch_op.drop_column('dblp_mdate')
+        batch_op.drop_column('dblp_key')
+    op.drop_index(op.f('ix_publicationrevue_dblp_key'), table_name='publicationrevue')
+    with op.batch_alter_table('publicationrevue') as batch_op:
+        batch_op.drop_column('dblp_mdate')
+        batch_op.drop_column('dblp_key')
@@ -0,0 +1,36 @@
+"""dblp search misses
+
+Revision ID: 5c8a0e3f7b21
+Revises: d41e9b6f2c78
+Create Date: 2026-10-18 17:21:09.482113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c8a0e3f7b21'
+down_revision: Union[str, Sequence[str], None] = 'd41e9b6f2c78'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('dblprecherchevide',
+    sa.Column('nom_recherche', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('tentatives', sa.Integer(), nullable=False),
+    sa.Column('recherche_a', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('nom_recherche')
+    )
+    op.create_index(op.f('ix_dblprecherchevide_recherche_a'), 'dblprecherchevide', ['recherche_a'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_dblprecherchevide_recherche_a'), table_name='dblprecherchevide')
+    op.drop_table('dblprecherchevide')
@@ -0,0 +1,32 @@
+"""chercheur openalex id
+
+Revision ID: 8e3b7a1d5f62
+Revises: 5c8a0e3f7b21
+Create Date: 2026-10-18 19:40:12.305871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e3b7a1d5f62'
+down_revision: Union[str, Sequence[str], None] = '5c8a0e3f7b21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('chercheur', sa.Column('openalex_id', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    op.create_index(op.f('ix_chercheur_openalex_id'), 'chercheur', ['openalex_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_chercheur_openalex_id'), table_name='chercheur')
+    with op.batch_alter_table('chercheur') as batch_op:
+        batch_op.drop_column('openalex_id')
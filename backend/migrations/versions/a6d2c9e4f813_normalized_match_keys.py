@@ -0,0 +1,54 @@
+"""normalized match keys: nom_cle on revue/conference, titre_cle on publications
+
+Revision ID: a6d2c9e4f813
+Revises: 8e3b7a1d5f62
+Create Date: 2026-10-18 21:05:44.812306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6d2c9e4f813'
+down_revision: Union[str, Sequence[str], None] = '8e3b7a1d5f62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# table -> (source column, key column)
+KEYS = {
+    'revue': ('nom', 'nom_cle'),
+    'conference': ('nom', 'nom_cle'),
+    'publicationrevue': ('titre', 'titre_cle'),
+    'publicationconference': ('titre', 'titre_cle'),
+}
+
+
+def _backfill(table: str, source: str, key: str) -> None:
+    # normalized in Python like Publications.revue_schemas.normalized_key, SQLite's UPPER() is ASCII only
+    connection = op.get_bind()
+    rows = connection.execute(sa.text(f"SELECT id, {source} FROM {table}")).all()
+    if rows:
+        connection.execute(
+            sa.text(f"UPDATE {table} SET {key} = :key WHERE id = :id"),
+            [{"id": id, "key": value.strip().upper() if value is not None else None} for id, value in rows],
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, (source, key) in KEYS.items():
+        op.add_column(table, sa.Column(key, sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+        _backfill(table, source, key)
+        op.create_index(op.f(f'ix_{table}_{key}'), table, [key], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, (source, key) in KEYS.items():
+        op.drop_index(op.f(f'ix_{table}_{key}'), table_name=table)
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column(key)
@@ -0,0 +1,51 @@
+"""openalex sources snapshot tables
+
+Revision ID: b7e2d4c81a35
+Revises: 3f1c2a7d9e04
+Create Date: 2026-10-18 14:05:12.527310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2d4c81a35'
+down_revision: Union[str, Sequence[str], None] = '3f1c2a7d9e04'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('openalexsource',
+    sa.Column('id', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('nom', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('nom_normalise', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('issn_l', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('issn', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('e_issn', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('is_indexed_in_scopus', sa.Boolean(), nullable=True),
+    sa.Column('homepage_url', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('works_count', sa.Integer(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_openalexsource_nom_normalise'), 'openalexsource', ['nom_normalise'], unique=False)
+    op.create_index(op.f('ix_openalexsource_issn_l'), 'openalexsource', ['issn_l'], unique=False)
+    op.create_table('openalexsourceissn',
+    sa.Column('issn', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('source_id', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.ForeignKeyConstraint(['source_id'], ['openalexsource.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('issn', 'source_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('openalexsourceissn')
+    op.drop_index(op.f('ix_openalexsource_issn_l'), table_name='openalexsource')
+    op.drop_index(op.f('ix_openalexsource_nom_normalise'), table_name='openalexsource')
+    op.drop_table('openalexsource')
@@ -0,0 +1,80 @@
+"""unique normalized keys: conference name, revue name without ISSN, title + year without DOI
+
+Revision ID: c3f8d5a1e297
+Revises: a6d2c9e4f813
+Create Date: 2026-10-18 21:48:09.540217
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f8d5a1e297'
+down_revision: Union[str, Sequence[str], None] = 'a6d2c9e4f813'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _duplicates(table: str, key_columns: list[str], where: str) -> dict[int, int]:
+    """id of each duplicate row -> id of the row it is merged into (the lowest id of its key)."""
+    not_null = " AND ".join(f"{column} IS NOT NULL" for column in key_columns)
+    rows = op.get_bind().execute(sa.text(
+        f"SELECT id, {', '.join(key_columns)} FROM {table} WHERE {not_null} AND {where} ORDER BY id"
+    )).all()
+    kept, merged = {}, {}
+    for id, *key in rows:
+        keeper = kept.setdefault(tuple(key), id)
+        if keeper != id:
+            merged[id] = keeper
+    return merged
+
+
+def _merge_venues(table: str, publication_table: str, ranking_table: str, fk: str, where: str) -> None:
+    merged = _duplicates(table, ["nom_cle"], where)
+    if not merged:
+        return
+    connection = op.get_bind()
+    params = [{"old": old, "new": new} for old, new in merged.items()]
+    connection.execute(sa.text(f"UPDATE {publication_table} SET {fk} = :new WHERE {fk} = :old"), params)
+    # rankings of the kept venue win, the years it does not have are taken from the duplicates
+    connection.execute(sa.text(f"UPDATE OR IGNORE {ranking_table} SET {fk} = :new WHERE {fk} = :old"), params)
+    connection.execute(sa.text(f"DELETE FROM {ranking_table} WHERE {fk} = :old"), params)
+    connection.execute(sa.text(f"DELETE FROM {table} WHERE id = :old"), params)
+
+
+def _merge_publications(table: str, link_table: str) -> None:
+    merged = _duplicates(table, ["titre_cle", "annee_publication"], "doi IS NULL")
+    if not merged:
+        return
+    connection = op.get_bind()
+    params = [{"old": old, "new": new} for old, new in merged.items()]
+    connection.execute(sa.text(f"UPDATE OR IGNORE {link_table} SET publication_id = :new WHERE publication_id = :old"), params)
+    connection.execute(sa.text(f"DELETE FROM {link_table} WHERE publication_id = :old"), params)
+    connection.execute(sa.text(f"DELETE FROM {table} WHERE id = :old"), params)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # rows duplicated by concurrent workers are merged into the oldest one first
+    _merge_venues('conference', 'publicationconference', 'conferenceranking', 'conference_id', "1 = 1")
+    _merge_venues('revue', 'publicationrevue', 'revueranking', 'revue_id', "issn IS NULL")
+    _merge_publications('publicationconference', 'lienchercheurconference')
+    _merge_publications('publicationrevue', 'lienchercheurrevue')
+
+    op.drop_index(op.f('ix_conference_nom_cle'), table_name='conference')
+    op.create_index(op.f('ix_conference_nom_cle'), 'conference', ['nom_cle'], unique=True)
+    op.create_index('uq_revue_nom_cle_sans_issn', 'revue', ['nom_cle'], unique=True, sqlite_where=sa.text('issn IS NULL'))
+    op.create_index('uq_publicationrevue_titre_cle_sans_doi', 'publicationrevue', ['titre_cle', 'annee_publication'], unique=True, sqlite_where=sa.text('doi IS NULL'))
+    op.create_index('uq_publicationconference_titre_cle_sans_doi', 'publicationconference', ['titre_cle', 'annee_publication'], unique=True, sqlite_where=sa.text('doi IS NULL'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_publicationconference_titre_cle_sans_doi', table_name='publicationconference')
+    op.drop_index('uq_publicationrevue_titre_cle_sans_doi', table_name='publicationrevue')
+    op.drop_index('uq_revue_nom_cle_sans_issn', table_name='revue')
+    op.drop_index(op.f('ix_conference_nom_cle'), table_name='conference')
+    op.create_index(op.f('ix_conference_nom_cle'), 'conference', ['nom_cle'], unique=False)
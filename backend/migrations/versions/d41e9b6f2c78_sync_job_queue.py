@@ -0,0 +1,47 @@
+"""sync job queue
+
+Revision ID: d41e9b6f2c78
+Revises: b7e2d4c81a35
+Create Date: 2026-10-18 15:02:37.118950
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41e9b6f2c78'
+down_revision: Union[str, Sequence[str], None] = 'b7e2d4c81a35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('syncjob',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('chercheur_id', sa.Integer(), nullable=False),
+    sa.Column('statut', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('incremental', sa.Boolean(), nullable=False),
+    sa.Column('tentatives', sa.Integer(), nullable=False),
+    sa.Column('worker', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('bail_expire_a', sa.DateTime(), nullable=True),
+    sa.Column('heartbeat_a', sa.DateTime(), nullable=True),
+    sa.Column('derniere_erreur', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('cree_a', sa.DateTime(), nullable=True),
+    sa.Column('termine_a', sa.DateTime(), nullable=True),
+    sa.CheckConstraint("statut IN ('pending','running','done','failed')", name='valid_sync_job_statut'),
+    sa.ForeignKeyConstraint(['chercheur_id'], ['chercheur.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('chercheur_id')
+    )
+    op.create_index(op.f('ix_syncjob_statut'), 'syncjob', ['statut'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_syncjob_statut'), table_name='syncjob')
+    op.drop_table('syncjob')
@@ -0,0 +1,52 @@
+"""issn/doi match keys: issn_cle on revue, doi_cle on publications
+
+Revision ID: e5a9b3c7d140
+Revises: c3f8d5a1e297
+Create Date: 2026-10-18 23:41:12.530871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a9b3c7d140'
+down_revision: Union[str, Sequence[str], None] = 'c3f8d5a1e297'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# table -> (source column, key column, normalization), same as normalized_issn/normalized_doi
+KEYS = {
+    'revue': ('issn', 'issn_cle', str.upper),
+    'publicationrevue': ('doi', 'doi_cle', str.lower),
+    'publicationconference': ('doi', 'doi_cle', str.lower),
+}
+
+
+def _backfill(table: str, source: str, key: str, normalize) -> None:
+    connection = op.get_bind()
+    rows = connection.execute(sa.text(f"SELECT id, {source} FROM {table} WHERE {source} IS NOT NULL")).all()
+    if rows:
+        connection.execute(
+            sa.text(f"UPDATE {table} SET {key} = :key WHERE id = :id"),
+            [{"id": id, "key": normalize(value.strip()) or None} for id, value in rows],
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, (source, key, normalize) in KEYS.items():
+        op.add_column(table, sa.Column(key, sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+        _backfill(table, source, key, normalize)
+        op.create_index(op.f(f'ix_{table}_{key}'), table, [key], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, (source, key, normalize) in KEYS.items():
+        op.drop_index(op.f(f'ix_{table}_{key}'), table_name=table)
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column(key)
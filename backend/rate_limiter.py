@@ -0,0 +1,109 @@
+import sqlite3
+import threading
+import time
+from settings import RATE_LIMIT_PATH,RATE_LIMITS,RATE_LIMIT_RECOVERY_SECONDS
+
+_local = threading.local()
+
+
+def _connection() -> sqlite3.Connection:
+    # the bucket lives in a small SQLite file so threads, processes and
+    # several workers started on the same box all draw from the same budget
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(RATE_LIMIT_PATH, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS buckets (
+                host TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                blocked_until REAL NOT NULL DEFAULT 0,
+                factor REAL NOT NULL DEFAULT 1
+            )"""
+        )
+        _local.conn = conn
+    return conn
+
+
+def _try_take(host: str, rate: float, burst: float) -> float:
+    """Take one token for host. Returns 0 on success, otherwise the seconds to wait before retrying."""
+    conn = _connection()
+    now = time.time()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        row = conn.execute(
+            "SELECT tokens, updated_at, blocked_until, factor FROM buckets WHERE host = ?", (host,)
+        ).fetchone()
+        if row is None:
+            tokens, updated_at, blocked_until, factor = burst, now, 0.0, 1.0
+        else:
+            tokens, updated_at, blocked_until, factor = row
+
+        elapsed = max(0.0, now - updated_at)
+        # after a 429 the rate is cut down, it climbs back to normal over RATE_LIMIT_RECOVERY_SECONDS
+        factor = min(1.0, factor + elapsed / RATE_LIMIT_RECOVERY_SECONDS)
+        effective_rate = rate * factor
+        tokens = min(burst, tokens + elapsed * effective_rate)
+
+        if now < blocked_until:
+            wait = blocked_until - now
+        elif tokens >= 1:
+            tokens -= 1
+            wait = 0.0
+        else:
+            wait = (1 - tokens) / effective_rate
+
+        conn.execute(
+            "INSERT OR REPLACE INTO buckets VALUES (?, ?, ?, ?, ?)",
+            (host, tokens, now, blocked_until, factor),
+        )
+        conn.execute("COMMIT")
+        return wait
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def acquire(host: str) -> float:
+    """
+    Block until host's budget allows one more request.
+    Hosts without an entry in settings.RATE_LIMITS are not limited.
+    Returns the time spent waiting.
+    """
+    limit = RATE_LIMITS.get(host)
+    if not limit:
+        return 0.0
+    rate, burst = limit
+    waited = 0.0
+    while True:
+        wait = _try_take(host, rate, burst)
+        if wait <= 0:
+            return waited
+        time.sleep(wait)
+        waited += wait
+
+
+def penalize(host: str, retry_after: float | None) -> None:
+    """
+    Called on a 429: empties the bucket, blocks every worker until Retry-After
+    has passed and halves the rate until it recovers.
+    """
+    if host not in RATE_LIMITS:
+        return
+    rate, burst = RATE_LIMITS[host]
+    now = time.time()
+    pause = retry_after if retry_after is not None else 1 / rate
+    conn = _connection()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        row = conn.execute("SELECT blocked_until, factor FROM buckets WHERE host = ?", (host,)).fetchone()
+        blocked_until, factor = row if row else (0.0, 1.0)
+        conn.execute(
+            "INSERT OR REPLACE INTO buckets VALUES (?, ?, ?, ?, ?)",
+            (host, 0.0, now, max(blocked_until, now + pause), max(0.1, factor / 2)),
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
@@ -0,0 +1,87 @@
+# --- Upstream HTTP client (http_client.py) ---
+HTTP_TIMEOUT = 15
+HTTP_MAX_RETRIES = 4
+# sleeps backoff * 2**(retry-1) between retries, unless the server sends Retry-After
+HTTP_BACKOFF_FACTOR = 1
+# connections kept alive per host, keep it >= ENRICHMENT_CONCURRENCY
+HTTP_POOL_SIZE = 16
+HTTP_USER_AGENT = "Mozilla/5.0 (compatible; dblp-fetcher/1.0)"
+
+# --- Shared rate limiter (rate_limiter.py) ---
+RATE_LIMIT_PATH = "rate_limits.db"
+# host -> (requests per second, burst)
+RATE_LIMITS = {
+    "dblp.org": (1.0, 3),
+    "api.openalex.org": (9.0, 10),
+}
+# seconds for a host to get back to its full rate after a 429
+RATE_LIMIT_RECOVERY_SECONDS = 60
+
+# --- Local HTTP response cache (http_cache.py) ---
+HTTP_CACHE_PATH = "http_cache.db"
+HTTP_CACHE_ENABLED = True
+# time to live in seconds for each endpoint family, see http_cache.ENDPOINT_FAMILIES
+HTTP_CACHE_TTL = {
+    "openalex_works": 7 * 24 * 3600,
+    "openalex_sources": 30 * 24 * 3600,
+    "dblp_person": 24 * 3600,
+    "dblp_search": 30 * 24 * 3600,
+    "default": 24 * 3600,
+}
+
+# --- Publication ingestion ---
+# OpenAlex/ranking lookups running at the same time for one researcher
+ENRICHMENT_CONCURRENCY = 8
+# DBLP records enriched (and kept in memory) together, also the DOI batch size sent to OpenAlex
+ENRICHMENT_BATCH_SIZE = 50
+# distinct venues (OpenAlex sources, venue names) memoized during a sync run
+VENUE_CACHE_SIZE = 5000
+
+# --- Sync work queue (Publications/sync_jobs.py) ---
+# a worker that stops heartbeating loses its job after this many seconds
+SYNC_LEASE_SECONDS = 600
+SYNC_HEARTBEAT_SECONDS = 60
+# a job failing this many times is left as 'failed' instead of going back to 'pending'
+SYNC_MAX_ATTEMPTS = 3
+# worker processes started by `python -m Publications.sync_jobs work`
+SYNC_WORKERS = 4
+
+# --- Staged sync pipeline (Publications/pipeline.py) ---
+# items waiting between two stages, a full queue makes the stage before it wait
+PIPELINE_QUEUE_SIZE = 200
+# threads per stage: DBLP person pages, OpenAlex lookups, ranking resolution (the writer is always one thread)
+PIPELINE_PARSE_WORKERS = 2
+PIPELINE_OPENALEX_WORKERS = 8
+PIPELINE_RANKING_WORKERS = 4
+# the writer commits every N publications, or after this many seconds without reaching N
+PIPELINE_WRITE_BATCH_SIZE = 200
+PIPELINE_WRITE_INTERVAL = 2.0
+
+# --- Researchers import / DBLP profile search (Chercheurs/) ---
+# DBLP author searches in flight at once, the dblp.org rate limit still applies
+DBLP_RESOLVE_CONCURRENCY = 4
+# DBLP URL backfill: searches per run (None for no limit, the rest waits for the next run),
+# rows committed together, and days before a name without DBLP profile is searched again
+DBLP_BACKFILL_MAX_SEARCHES = None
+DBLP_BACKFILL_COMMIT_SIZE = 50
+DBLP_MISS_TTL_DAYS = 30
+
+# --- Instrumentation (metrics.py) ---
+METRICS_ENABLED = True
+# JSON report written at the end of each pipeline run, None to only print the summary
+METRICS_REPORT_PATH = None
+
+# --- Memory bound of a sync run (Publications/pipeline.py) ---
+# researchers read from the database per keyset page
+RESEARCHER_BATCH_SIZE = 100
+# resident memory ceiling in MB, None for no limit: no new researcher is started above it
+MEMORY_RSS_LIMIT_MB = None
+# seconds between two RSS samples (peak memory per researcher)
+MEMORY_SAMPLE_INTERVAL = 0.5
+
+# --- OpenAlex author mode (Publications/pipeline.py) ---
+# pull all the OpenAlex works of a researcher (pages of 200) and reconcile them with the DBLP
+# records by DOI or title, instead of looking each record up
+OPENALEX_AUTHOR_MODE = True
+# below this many records to enrich the DOI batches cost fewer requests than the works list
+OPENALEX_AUTHOR_MODE_MIN_RECORDS = 20